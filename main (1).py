@@ -1,84 +1,1117 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
+import hashlib
+import hmac
 import json
-import random
-import math
+import logging
+import logging.handlers
 import os
-import webbrowser
-
-def calcular_distancia(ponto1, ponto2):
-    """Calcula a distância entre dois pontos em coordenadas geográficas (em km)."""
-    lat1, lon1 = ponto1
-    lat2, lon2 = ponto2
-    raio_terra = 6371  # Raio médio da Terra em km
-
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    diff_lat = math.radians(lat2 - lat1)
-    diff_lon = math.radians(lon2 - lon1)
-
-    a = math.sin(diff_lat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(diff_lon / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-    return raio_terra * c
-
-def calcular_pontos(distancia_km):
-    """Calcula os pontos com base na distância."""
-    if distancia_km < 50:
-        return 1000
-    elif distancia_km < 500:
-        return 800
-    elif distancia_km < 2000:
-        return 500
-    elif distancia_km < 5000:
-        return 200
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from motor_jogo import (
+    MAX_SUGESTOES, MotorJogo, carregar_paises, compilar_paises, normalizar_texto, valores_campo
+)
+
+PASTA_IMAGENS = "imagens"
+EXTENSOES_IMAGEM = [".jpg", ".jpeg", ".png", ".JPG", ".JPEG", ".PNG"]
+TAMANHO_IMAGEM_JOGO = (400, 250)
+TAMANHO_MAPA_AMPLIADO = (800, None)  # Largura fixa, altura proporcional
+LIMITE_CACHE_IMAGENS = 32 * 1024 * 1024  # Memória máxima (bytes) para imagens já redimensionadas
+PASTA_MINIATURAS = os.path.join(PASTA_IMAGENS, ".cache")
+INTERVALO_GRAVACAO_MS = 5000  # Alterações aos utilizadores são gravadas juntas, no máximo a cada 5 s
+FICHEIRO_UTILIZADORES_JSON = "utilizadores.json"
+FICHEIRO_UTILIZADORES_DB = "utilizadores.db"
+ARMAZEM_UTILIZADORES = "sqlite"  # "sqlite" ou "json"
+SELECAO_ADAPTATIVA = True  # Escolher os países pelo histórico do jogador (False ou --semente = ao acaso)
+UTILIZADOR_PADRAO = ("admin", "admin123")
+# Palavras-passe: PBKDF2-SHA256. Ajustar com --calibrar-password para ~100 ms por verificação.
+ITERACOES_PASSWORD = 250000
+ALGORITMO_PASSWORD = "pbkdf2_sha256"
+TEMPO_ALVO_PASSWORD = 0.1  # segundos
+TAMANHO_CLASSIFICACAO = 10
+COLUNAS_NIVEIS_EXTRA = 3  # Botões por linha para os níveis que não são principais
+COLUNAS_FILTROS = 5  # Botões por linha nos filtros da classificação
+FICHEIRO_EVENTOS = "eventos.jsonl"
+ATRASO_SUGESTOES_MS = 120  # Espera depois da última tecla antes de atualizar as sugestões
+# Níveis das mensagens: "INFO" ou por subsistema, ex.: "WARNING,imagens=DEBUG".
+# Pode ser mudado com a variável de ambiente EXPLORADOR_LOG ou com --log=...
+NIVEL_LOG = "INFO"
+FORMATO_LOG = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# Um logger por subsistema (todos debaixo de "explorador")
+log_imagens = logging.getLogger("explorador.imagens")
+log_dados = logging.getLogger("explorador.dados")
+log_utilizadores = logging.getLogger("explorador.utilizadores")
+log_jogo = logging.getLogger("explorador.jogo")
+
+# Separadores usados nos nomes de ficheiros de imagem
+TABELA_SEPARADORES_ARQUIVO = str.maketrans({" ": "_", "-": "_", "'": None})
+
+def configurar_logging(especificacao=None):
+    """
+    Envia as mensagens de todos os loggers "explorador.*" por uma fila: quem regista
+    só põe a mensagem na fila e uma thread à parte escreve no stderr (que nos
+    quiosques vai para o journald, que é lento). Devolve o QueueListener, que
+    deve ser parado no fim para escrever o que falta.
+    """
+    especificacao = especificacao or os.environ.get("EXPLORADOR_LOG") or NIVEL_LOG
+    raiz = logging.getLogger("explorador")
+
+    # "WARNING,imagens=DEBUG": o primeiro é o nível geral, os outros são por subsistema.
+    # Um nível mal escrito é ignorado (com aviso) para o jogo arrancar na mesma.
+    raiz.setLevel(NIVEL_LOG)
+    invalidas = []
+    for parte in especificacao.split(","):
+        if not parte.strip():
+            continue
+        nome, _, nivel = parte.strip().rpartition("=")
+        if not isinstance(logging.getLevelName(nivel.upper()), int):
+            invalidas.append(parte.strip())
+            continue
+        logger = logging.getLogger(f"explorador.{nome}") if nome else raiz
+        logger.setLevel(nivel.upper())
+
+    fila = queue.SimpleQueue()
+    saida = logging.StreamHandler()
+    saida.setFormatter(logging.Formatter(FORMATO_LOG))
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    raiz.propagate = False
+
+    ouvinte = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    ouvinte.start()
+    for parte in invalidas:
+        raiz.warning("Nível de log inválido ignorado: %r", parte)
+    return ouvinte
+
+def calcular_tamanho_final(tamanho_original, tamanho):
+    """Resolve um tamanho (largura, altura); altura None mantém a proporção original."""
+    largura, altura = tamanho
+    if altura is None:
+        largura_original, altura_original = tamanho_original
+        altura = max(1, int(altura_original * (largura / largura_original)))
+    return (largura, altura)
+
+class MiniaturasDisco:
+    """
+    Guarda no disco versões já reduzidas das imagens (ex.: imagens/.cache/400x250/brasil.jpg).
+    Uma miniatura é válida enquanto for mais recente do que a imagem original.
+    """
+
+    def __init__(self, pasta=PASTA_MINIATURAS):
+        self.pasta = pasta
+
+    @staticmethod
+    def nome_pasta(tamanho):
+        """Nome da subpasta para um tamanho (ex.: '400x250' ou '800xauto')."""
+        largura, altura = tamanho
+        return f"{largura}x{altura if altura is not None else 'auto'}"
+
+    def caminho_miniatura(self, caminho, tamanho):
+        """Caminho onde fica a miniatura de uma imagem para um dado tamanho."""
+        return os.path.join(self.pasta, self.nome_pasta(tamanho), os.path.basename(caminho))
+
+    def obter_caminho(self, caminho, tamanho):
+        """Devolve o caminho da miniatura, gerando-a se não existir ou estiver desatualizada."""
+        miniatura = self.caminho_miniatura(caminho, tamanho)
+        try:
+            if os.path.getmtime(miniatura) >= os.path.getmtime(caminho):
+                return miniatura
+        except OSError:
+            pass
+
+        self.gerar(caminho, tamanho, miniatura)
+        return miniatura
+
+    def gerar(self, caminho, tamanho, miniatura):
+        """Cria a miniatura, usando a descodificação reduzida do PIL para não abrir a imagem inteira."""
+        from PIL import Image
+
+        with Image.open(caminho) as original:
+            tamanho_final = calcular_tamanho_final(original.size, tamanho)
+            formato = original.format
+
+            # Em JPEG, draft() faz o descodificador reduzir a imagem (1/2, 1/4, 1/8) logo ao ler
+            original.draft("RGB", tamanho_final)
+            imagem = original
+            # Noutros formatos, reduce() corta por um fator inteiro antes do LANCZOS
+            fator = min(imagem.size[0] // tamanho_final[0], imagem.size[1] // tamanho_final[1])
+            if fator >= 2:
+                imagem = imagem.reduce(fator)
+            imagem = imagem.resize(tamanho_final, Image.Resampling.LANCZOS)
+
+        os.makedirs(os.path.dirname(miniatura), exist_ok=True)
+        # Escrever para um ficheiro temporário e só depois substituir, para nunca ficar meio escrito
+        temporario = f"{miniatura}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if formato == "JPEG":
+            imagem.convert("RGB").save(temporario, "JPEG", quality=85, optimize=True)
+        else:
+            imagem.save(temporario, formato or "PNG")
+        os.replace(temporario, miniatura)
+
+    def gerar_todas(self, caminhos, tamanhos):
+        """Gera (ou atualiza) as miniaturas de todas as imagens para todos os tamanhos."""
+        geradas = 0
+        for caminho in caminhos:
+            for tamanho in tamanhos:
+                miniatura = self.caminho_miniatura(caminho, tamanho)
+                try:
+                    if os.path.getmtime(miniatura) >= os.path.getmtime(caminho):
+                        continue
+                except OSError:
+                    pass
+                self.gerar(caminho, tamanho, miniatura)
+                geradas += 1
+        return geradas
+
+class CacheImagens:
+    """
+    Cache LRU de imagens já abertas e redimensionadas.
+    A chave é (caminho, tamanho, data de modificação), por isso um ficheiro alterado
+    no disco volta a ser carregado. Quando passa do limite de memória, sai a imagem
+    usada há mais tempo. Pode ser usada a partir de várias threads.
+    """
+
+    def __init__(self, limite_bytes=LIMITE_CACHE_IMAGENS, miniaturas=None):
+        self.limite_bytes = limite_bytes
+        self.miniaturas = miniaturas
+        self.imagens = OrderedDict()
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.removidas = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def tamanho_em_bytes(imagem):
+        """Memória aproximada ocupada pelos píxeis da imagem."""
+        largura, altura = imagem.size
+        return largura * altura * len(imagem.getbands())
+
+    def obter(self, caminho, tamanho):
+        """Devolve a imagem redimensionada, carregando-a do disco só se não estiver na cache."""
+        chave = (caminho, tuple(tamanho), os.path.getmtime(caminho))
+
+        with self.lock:
+            imagem = self.imagens.get(chave)
+            if imagem is not None:
+                self.imagens.move_to_end(chave)
+                self.acertos += 1
+                return imagem
+            self.falhas += 1
+
+        # A leitura do disco é feita fora do lock para não bloquear as outras threads
+        from PIL import Image
+        origem = caminho
+        if self.miniaturas is not None:
+            try:
+                origem = self.miniaturas.obter_caminho(caminho, tamanho)
+            except OSError as e:
+                # Sem permissão de escrita, por exemplo: usar a imagem original
+                log_imagens.warning("Não foi possível criar miniatura de %s: %s", caminho, e)
+
+        with Image.open(origem) as original:
+            tamanho_final = calcular_tamanho_final(original.size, tamanho)
+            if original.size == tamanho_final:
+                original.load()
+                imagem = original.copy()
+            else:
+                imagem = original.resize(tamanho_final, Image.Resampling.LANCZOS)
+        self.guardar(chave, imagem)
+        return imagem
+
+    def guardar(self, chave, imagem):
+        """Guarda a imagem e remove as menos usadas se o limite for ultrapassado."""
+        tamanho = self.tamanho_em_bytes(imagem)
+        if tamanho > self.limite_bytes:
+            return
+
+        with self.lock:
+            if chave in self.imagens:
+                # Outra thread carregou a mesma imagem entretanto
+                self.imagens.move_to_end(chave)
+                return
+
+            self.imagens[chave] = imagem
+            self.bytes_usados += tamanho
+
+            while self.bytes_usados > self.limite_bytes:
+                _, antiga = self.imagens.popitem(last=False)
+                self.bytes_usados -= self.tamanho_em_bytes(antiga)
+                self.removidas += 1
+
+    def limpar(self):
+        """Esvazia a cache (os contadores mantêm-se)."""
+        with self.lock:
+            self.imagens.clear()
+            self.bytes_usados = 0
+
+    def estatisticas(self):
+        """Devolve os contadores da cache."""
+        return {
+            "imagens": len(self.imagens),
+            "bytes": self.bytes_usados,
+            "limite_bytes": self.limite_bytes,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "removidas": self.removidas
+        }
+
+def gerar_hash_password(password, iteracoes=ITERACOES_PASSWORD):
+    """Devolve a palavra-passe protegida no formato 'pbkdf2_sha256$iterações$sal$hash'."""
+    sal = os.urandom(16)
+    derivada = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, iteracoes)
+    return f"{ALGORITMO_PASSWORD}${iteracoes}${sal.hex()}${derivada.hex()}"
+
+def verificar_password(password, guardada):
+    """
+    Compara a palavra-passe com a guardada. Devolve (correta, precisa_atualizar).
+    precisa_atualizar é True para palavras-passe antigas em texto simples ou
+    protegidas com menos iterações do que as atuais.
+    """
+    partes = guardada.split("$")
+    if len(partes) != 4 or partes[0] != ALGORITMO_PASSWORD:
+        # Formato antigo: texto simples
+        return hmac.compare_digest(guardada.encode("utf-8"), password.encode("utf-8")), True
+
+    _, iteracoes, sal, esperada = partes
+    try:
+        iteracoes = int(iteracoes)
+        sal = bytes.fromhex(sal)
+        esperada = bytes.fromhex(esperada)
+        if iteracoes <= 0:
+            raise ValueError("número de iterações inválido")
+    except ValueError as e:
+        # Hash estragado: a conta não pode entrar, mas o login continua a responder
+        log_utilizadores.error("Palavra-passe guardada com formato inválido: %s", e)
+        return False, False
+    derivada = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, iteracoes)
+    return hmac.compare_digest(derivada, esperada), iteracoes < ITERACOES_PASSWORD
+
+class CacheVerificacao:
+    """
+    Lembra-se das palavras-passe já verificadas nesta sessão, para que voltar a entrar
+    não custe outra vez a derivação lenta. Não guarda a palavra-passe: só um SHA-256
+    dela com um segredo aleatório criado ao arrancar.
+    """
+
+    def __init__(self, maximo=256):
+        self.segredo = os.urandom(32)
+        self.verificadas = OrderedDict()
+        self.maximo = maximo
+        self.lock = threading.Lock()
+
+    def resumo(self, password):
+        return hmac.new(self.segredo, password.encode("utf-8"), hashlib.sha256).digest()
+
+    def verificar(self, password, guardada):
+        """Igual a verificar_password, mas usa e atualiza a cache."""
+        resumo = self.resumo(password)
+        with self.lock:
+            conhecido = self.verificadas.get(guardada)
+        if conhecido is not None and hmac.compare_digest(conhecido, resumo):
+            return True, False
+
+        correta, precisa_atualizar = verificar_password(password, guardada)
+        if correta and not precisa_atualizar:
+            with self.lock:
+                self.verificadas[guardada] = resumo
+                if len(self.verificadas) > self.maximo:
+                    self.verificadas.popitem(last=False)
+        return correta, precisa_atualizar
+
+def calibrar_password(tempo_alvo=TEMPO_ALVO_PASSWORD):
+    """Mede o PBKDF2 nesta máquina e indica as iterações que dão o tempo alvo."""
+    amostra = 50000
+    inicio = time.perf_counter()
+    hashlib.pbkdf2_hmac("sha256", b"calibrar", os.urandom(16), amostra)
+    duracao = time.perf_counter() - inicio
+
+    iteracoes = max(100000, int(amostra * tempo_alvo / duracao) // 10000 * 10000)
+    inicio = time.perf_counter()
+    verificar_password("calibrar", gerar_hash_password("calibrar", iteracoes))
+    medido = (time.perf_counter() - inicio) / 2
+
+    print("=== CALIBRAÇÃO DA PALAVRA-PASSE ===")
+    print(f"  {amostra} iterações: {duracao * 1000:.1f} ms")
+    print(f"  Sugestão: ITERACOES_PASSWORD = {iteracoes} (~{medido * 1000:.0f} ms por verificação)")
+    print(f"  Atual:    ITERACOES_PASSWORD = {ITERACOES_PASSWORD}")
+    return iteracoes
+
+class ArmazemUtilizadores(ABC):
+    """
+    Interface comum para guardar contas e estatísticas dos utilizadores.
+    As alterações ficam pendentes até se chamar gravar(), para que várias
+    atualizações seguidas sejam escritas de uma só vez.
+    """
+
+    CAMPOS = ("password", "pontuacao_maxima", "jogos_completos")
+
+    @property
+    @abstractmethod
+    def alterado(self):
+        """True se há alterações por gravar."""
+
+    @abstractmethod
+    def obter(self, username):
+        """Dados do utilizador (dicionário) ou None se não existir."""
+
+    def existe(self, username):
+        """Indica se o utilizador existe."""
+        return self.obter(username) is not None
+
+    @abstractmethod
+    def criar(self, username, password):
+        """Cria um utilizador novo com as estatísticas a zero. Devolve False se já existir."""
+
+    @abstractmethod
+    def atualizar(self, username, **campos):
+        """Altera campos de um utilizador."""
+
+    @abstractmethod
+    def incrementar(self, username, campo, quantidade=1):
+        """Soma uma quantidade a um campo numérico."""
+
+    @abstractmethod
+    def contar(self):
+        """Número de utilizadores."""
+
+    @abstractmethod
+    def registar_pontuacao(self, username, nivel, pontos):
+        """
+        Guarda a pontuação de um jogo se for recorde do utilizador nesse nível
+        e/ou no geral (pontuacao_maxima). Devolve True se for um novo recorde geral.
+        Pontuações de 0 (ou menos) são ignoradas.
+        """
+
+    @abstractmethod
+    def classificacao(self, nivel=None, n=TAMANHO_CLASSIFICACAO):
+        """Os n melhores (username, pontos) de um nível, ou no geral se nivel for None."""
+
+    @abstractmethod
+    def historico_paises(self, username):
+        """Histórico do utilizador para a seleção adaptativa: país -> [força, distância média]."""
+
+    @abstractmethod
+    def registar_historico_pais(self, username, pais, forca, distancia):
+        """Guarda o estado de um país no histórico do utilizador."""
+
+    @abstractmethod
+    def gravar(self):
+        """Escreve as alterações pendentes."""
+
+    def fechar(self):
+        """Grava e liberta recursos."""
+        self.gravar()
+
+class ArmazemUtilizadoresJSON(ArmazemUtilizadores):
+    """Todos os utilizadores num dicionário, gravado inteiro no ficheiro JSON."""
+
+    def __init__(self, caminho=FICHEIRO_UTILIZADORES_JSON):
+        self.caminho = caminho
+        self.pendente = False
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                self.dados = json.load(f)
+        except FileNotFoundError:
+            self.dados = {}
+
+        # Classificações sempre ordenadas: nível (None = geral) -> lista de (-pontos, username).
+        # São construídas uma vez e depois atualizadas só com o utilizador que mudou.
+        self.rankings = defaultdict(list)
+        for username, dados in self.dados.items():
+            if dados.get("pontuacao_maxima", 0) > 0:
+                self.rankings[None].append((-dados["pontuacao_maxima"], username))
+            for nivel, pontos in dados.get("pontuacoes_nivel", {}).items():
+                if pontos > 0:
+                    self.rankings[nivel].append((-pontos, username))
+        for ranking in self.rankings.values():
+            ranking.sort()
+
+    @property
+    def alterado(self):
+        return self.pendente
+
+    def atualizar_ranking(self, nivel, username, antigos, novos):
+        """Troca a posição do utilizador numa classificação (procura binária, sem reordenar)."""
+        ranking = self.rankings[nivel]
+        if antigos > 0:
+            i = bisect_left(ranking, (-antigos, username))
+            if i < len(ranking) and ranking[i] == (-antigos, username):
+                del ranking[i]
+        # Tal como no SQLite, quem tem 0 pontos não aparece na classificação
+        if novos > 0:
+            insort(ranking, (-novos, username))
+
+    def obter(self, username):
+        return self.dados.get(username)
+
+    def criar(self, username, password):
+        if username in self.dados:
+            return False
+        self.dados[username] = {
+            "password": password,
+            "pontuacao_maxima": 0,
+            "jogos_completos": 0
+        }
+        self.pendente = True
+        return True
+
+    def incrementar(self, username, campo, quantidade=1):
+        self.dados[username][campo] = self.dados[username].get(campo, 0) + quantidade
+        self.pendente = True
+
+    def contar(self):
+        return len(self.dados)
+
+    def registar_pontuacao(self, username, nivel, pontos):
+        if pontos <= 0:
+            return False
+        dados = self.dados[username]
+        pontuacoes_nivel = dados.setdefault("pontuacoes_nivel", {})
+
+        antigos_nivel = pontuacoes_nivel.get(nivel, 0)
+        if pontos > antigos_nivel:
+            pontuacoes_nivel[nivel] = pontos
+            self.atualizar_ranking(nivel, username, antigos_nivel, pontos)
+            self.pendente = True
+
+        antigos = dados.get("pontuacao_maxima", 0)
+        if pontos > antigos:
+            dados["pontuacao_maxima"] = pontos
+            self.atualizar_ranking(None, username, antigos, pontos)
+            self.pendente = True
+            return True
+        return False
+
+    def classificacao(self, nivel=None, n=TAMANHO_CLASSIFICACAO):
+        return [(username, -pontos) for pontos, username in self.rankings[nivel][:n]]
+
+    def historico_paises(self, username):
+        return {pais: list(estado) for pais, estado in self.dados[username].get("historico_paises", {}).items()}
+
+    def registar_historico_pais(self, username, pais, forca, distancia):
+        self.dados[username].setdefault("historico_paises", {})[pais] = [forca, distancia]
+        self.pendente = True
+
+    def atualizar(self, username, **campos):
+        antigos = self.dados[username].get("pontuacao_maxima", 0)
+        self.dados[username].update(campos)
+        if "pontuacao_maxima" in campos:
+            self.atualizar_ranking(None, username, antigos, campos["pontuacao_maxima"])
+        self.pendente = True
+
+    def gravar(self):
+        """
+        Escreve primeiro num ficheiro temporário e depois substitui o original, por isso
+        uma falha a meio nunca deixa o ficheiro cortado.
+        """
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.dados, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+        self.pendente = False
+
+class ArmazemUtilizadoresSQLite(ArmazemUtilizadores):
+    """
+    Utilizadores numa base de dados SQLite (modo WAL), com índice por nome e por
+    pontuação máxima. Cada operação lê ou escreve só a linha do utilizador.
+    """
+
+    def __init__(self, caminho=FICHEIRO_UTILIZADORES_DB):
+        self.caminho = caminho
+        self.ligacao = sqlite3.connect(caminho)
+        self.ligacao.row_factory = sqlite3.Row
+        self.ligacao.execute("PRAGMA journal_mode=WAL")
+        self.ligacao.execute("PRAGMA synchronous=NORMAL")
+        self.ligacao.execute("""
+            CREATE TABLE IF NOT EXISTS utilizadores (
+                username TEXT PRIMARY KEY,
+                password TEXT NOT NULL,
+                pontuacao_maxima INTEGER NOT NULL DEFAULT 0,
+                jogos_completos INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.ligacao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_utilizadores_pontuacao_nome "
+            "ON utilizadores (pontuacao_maxima DESC, username)"
+        )
+        self.ligacao.execute("""
+            CREATE TABLE IF NOT EXISTS pontuacoes (
+                username TEXT NOT NULL REFERENCES utilizadores (username),
+                nivel TEXT NOT NULL,
+                pontuacao INTEGER NOT NULL,
+                PRIMARY KEY (username, nivel)
+            )
+        """)
+        self.ligacao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pontuacoes_nivel_nome ON pontuacoes (nivel, pontuacao DESC, username)"
+        )
+        # Índices das versões anteriores (sem o nome para desempatar)
+        self.ligacao.execute("DROP INDEX IF EXISTS idx_utilizadores_pontuacao")
+        self.ligacao.execute("DROP INDEX IF EXISTS idx_pontuacoes_nivel")
+        self.ligacao.execute("""
+            CREATE TABLE IF NOT EXISTS historico_paises (
+                username TEXT NOT NULL REFERENCES utilizadores (username),
+                pais TEXT NOT NULL,
+                forca INTEGER NOT NULL,
+                distancia REAL NOT NULL,
+                PRIMARY KEY (username, pais)
+            )
+        """)
+        self.ligacao.commit()
+
+    @property
+    def alterado(self):
+        return self.ligacao.in_transaction
+
+    def obter(self, username):
+        linha = self.ligacao.execute(
+            "SELECT password, pontuacao_maxima, jogos_completos FROM utilizadores WHERE username = ?",
+            (username,)
+        ).fetchone()
+        return dict(linha) if linha else None
+
+    def criar(self, username, password):
+        cursor = self.ligacao.execute(
+            "INSERT OR IGNORE INTO utilizadores (username, password) VALUES (?, ?)",
+            (username, password)
+        )
+        return cursor.rowcount == 1
+
+    def atualizar(self, username, **campos):
+        for campo in campos:
+            if campo not in self.CAMPOS:
+                raise ValueError(f"Campo desconhecido: {campo}")
+        atribuicoes = ", ".join(f"{campo} = ?" for campo in campos)
+        self.ligacao.execute(
+            f"UPDATE utilizadores SET {atribuicoes} WHERE username = ?",
+            (*campos.values(), username)
+        )
+
+    def incrementar(self, username, campo, quantidade=1):
+        if campo not in self.CAMPOS:
+            raise ValueError(f"Campo desconhecido: {campo}")
+        self.ligacao.execute(
+            f"UPDATE utilizadores SET {campo} = {campo} + ? WHERE username = ?",
+            (quantidade, username)
+        )
+
+    def contar(self):
+        return self.ligacao.execute("SELECT COUNT(*) FROM utilizadores").fetchone()[0]
+
+    def registar_pontuacao(self, username, nivel, pontos):
+        # Sair de um nível sem pontos não cria uma linha (nem entra na classificação)
+        if pontos <= 0:
+            return False
+        self.ligacao.execute(
+            "INSERT INTO pontuacoes (username, nivel, pontuacao) VALUES (?, ?, ?) "
+            "ON CONFLICT (username, nivel) DO UPDATE SET pontuacao = excluded.pontuacao "
+            "WHERE excluded.pontuacao > pontuacoes.pontuacao",
+            (username, nivel, pontos)
+        )
+        cursor = self.ligacao.execute(
+            "UPDATE utilizadores SET pontuacao_maxima = ? WHERE username = ? AND pontuacao_maxima < ?",
+            (pontos, username, pontos)
+        )
+        return cursor.rowcount == 1
+
+    def classificacao(self, nivel=None, n=TAMANHO_CLASSIFICACAO):
+        # As duas consultas percorrem só o início do índice da pontuação
+        if nivel is None:
+            linhas = self.ligacao.execute(
+                "SELECT username, pontuacao_maxima FROM utilizadores WHERE pontuacao_maxima > 0 "
+                "ORDER BY pontuacao_maxima DESC, username LIMIT ?",
+                (n,)
+            )
+        else:
+            linhas = self.ligacao.execute(
+                "SELECT username, pontuacao FROM pontuacoes WHERE nivel = ? AND pontuacao > 0 "
+                "ORDER BY pontuacao DESC, username LIMIT ?",
+                (nivel, n)
+            )
+        return [tuple(linha) for linha in linhas]
+
+    def historico_paises(self, username):
+        linhas = self.ligacao.execute(
+            "SELECT pais, forca, distancia FROM historico_paises WHERE username = ?",
+            (username,)
+        )
+        return {pais: [forca, distancia] for pais, forca, distancia in linhas}
+
+    def registar_historico_pais(self, username, pais, forca, distancia):
+        self.ligacao.execute(
+            "INSERT INTO historico_paises (username, pais, forca, distancia) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (username, pais) DO UPDATE SET forca = excluded.forca, distancia = excluded.distancia",
+            (username, pais, forca, distancia)
+        )
+
+    def gravar(self):
+        self.ligacao.commit()
+
+    def fechar(self):
+        self.gravar()
+        self.ligacao.close()
+
+def migrar_utilizadores_json(caminho_json=FICHEIRO_UTILIZADORES_JSON, caminho_db=FICHEIRO_UTILIZADORES_DB):
+    """
+    Copia os utilizadores do ficheiro JSON para a base de dados SQLite.
+    Utilizadores que já existam na base de dados não são alterados.
+    Devolve o número de utilizadores copiados.
+    """
+    origem = ArmazemUtilizadoresJSON(caminho_json)
+    destino = ArmazemUtilizadoresSQLite(caminho_db)
+    with destino.ligacao:
+        cursor = destino.ligacao.executemany(
+            "INSERT OR IGNORE INTO utilizadores (username, password, pontuacao_maxima, jogos_completos) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (username, dados["password"], dados.get("pontuacao_maxima", 0), dados.get("jogos_completos", 0))
+                for username, dados in origem.dados.items()
+            ]
+        )
+        destino.ligacao.executemany(
+            "INSERT OR IGNORE INTO pontuacoes (username, nivel, pontuacao) VALUES (?, ?, ?)",
+            [
+                (username, nivel, pontos)
+                for username, dados in origem.dados.items()
+                for nivel, pontos in dados.get("pontuacoes_nivel", {}).items()
+            ]
+        )
+        destino.ligacao.executemany(
+            "INSERT OR IGNORE INTO historico_paises (username, pais, forca, distancia) VALUES (?, ?, ?, ?)",
+            [
+                (username, pais, forca, distancia)
+                for username, dados in origem.dados.items()
+                for pais, (forca, distancia) in dados.get("historico_paises", {}).items()
+            ]
+        )
+    destino.fechar()
+    return cursor.rowcount
+
+def abrir_armazem_utilizadores(tipo=ARMAZEM_UTILIZADORES):
+    """
+    Abre o armazenamento de utilizadores. Na primeira vez com SQLite, os utilizadores
+    do utilizadores.json são migrados automaticamente. Se não houver nenhum utilizador,
+    cria o utilizador padrão.
+    """
+    if tipo == "sqlite":
+        if not os.path.exists(FICHEIRO_UTILIZADORES_DB) and os.path.exists(FICHEIRO_UTILIZADORES_JSON):
+            migrados = migrar_utilizadores_json()
+            log_utilizadores.info(
+                "%d utilizadores migrados de '%s' para '%s'",
+                migrados, FICHEIRO_UTILIZADORES_JSON, FICHEIRO_UTILIZADORES_DB
+            )
+        armazem = ArmazemUtilizadoresSQLite()
     else:
-        return 50
+        armazem = ArmazemUtilizadoresJSON()
+
+    if armazem.contar() == 0:
+        username, password = UTILIZADOR_PADRAO
+        armazem.criar(username, gerar_hash_password(password))
+        armazem.gravar()
+    return armazem
+
+class RegistoEventos:
+    """
+    Registo das rondas num ficheiro JSONL (um evento por linha), só acrescentado.
+    registar() apenas põe o evento numa fila; uma thread à parte escreve no disco,
+    por isso o jogo nunca fica à espera do ficheiro.
+    """
+
+    def __init__(self, caminho=FICHEIRO_EVENTOS):
+        self.caminho = caminho
+        self.fila = queue.Queue()
+        self.ativo = True  # Fica False se o ficheiro não puder ser escrito
+        self.thread = threading.Thread(target=self.escrever, name="registo-eventos", daemon=True)
+        self.thread.start()
+
+    def registar(self, tipo, **dados):
+        """Acrescenta um evento (com a hora atual) à fila de escrita."""
+        if not self.ativo:
+            return  # Sem thread de escrita a fila só cresceria
+        dados["tipo"] = tipo
+        dados["t"] = round(time.time(), 3)
+        self.fila.put(dados)
+
+    def escrever(self):
+        """Thread de escrita: grava os eventos da fila, uma linha de cada vez."""
+        try:
+            # buffering=1: cada linha vai para o ficheiro assim que está completa
+            with open(self.caminho, 'a', encoding='utf-8', buffering=1) as f:
+                while True:
+                    evento = self.fila.get()
+                    if evento is None:
+                        break
+                    f.write(json.dumps(evento, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError as e:
+            self.ativo = False
+            log_jogo.error("Erro ao escrever o registo de eventos (o registo fica desligado): %s", e)
+            # Descartar o que já estava na fila
+            while True:
+                try:
+                    self.fila.get_nowait()
+                except queue.Empty:
+                    break
+
+    def fechar(self):
+        """Escreve o que falta e termina a thread."""
+        self.fila.put(None)
+        self.thread.join(timeout=5)
+
+def ler_eventos(caminho=FICHEIRO_EVENTOS):
+    """
+    Lê o registo de eventos linha a linha (gerador), por isso ficheiros enormes
+    ocupam sempre pouca memória. Linhas estragadas (ex.: cortadas) são ignoradas.
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+
+def analisar_eventos(eventos):
+    """
+    Estatísticas por país a partir de uma sequência de eventos: rondas, acertos,
+    palpites errados por ronda, distância média dos palpites errados, pistas e tempo médio.
+    Só guarda totais por país, por isso a memória não depende do tamanho do registo.
+    """
+    totais = defaultdict(lambda: {
+        "rondas": 0, "acertos": 0, "errados": 0, "soma_distancia": 0.0, "pistas": 0, "soma_tempo": 0.0
+    })
+
+    for evento in eventos:
+        tipo = evento.get("tipo")
+        pais = evento.get("pais")
+        if pais is None:
+            continue
+        total = totais[pais]
+        if tipo == "ronda":
+            total["rondas"] += 1
+        elif tipo == "palpite" and evento.get("correto"):
+            total["acertos"] += 1
+            total["soma_tempo"] += evento.get("tempo", 0.0)
+        elif tipo == "palpite":
+            total["errados"] += 1
+            total["soma_distancia"] += evento.get("distancia", 0.0)
+        elif tipo == "pista":
+            total["pistas"] += 1
+
+    estatisticas = {}
+    for pais, total in totais.items():
+        rondas = max(total["rondas"], 1)
+        estatisticas[pais] = {
+            "rondas": total["rondas"],
+            "acertos": total["acertos"],
+            "taxa_acerto": total["acertos"] / rondas,
+            # Dificuldade: palpites errados em média por ronda
+            "dificuldade": total["errados"] / rondas,
+            "distancia_media": total["soma_distancia"] / total["errados"] if total["errados"] else 0.0,
+            "pistas_por_ronda": total["pistas"] / rondas,
+            "tempo_medio": total["soma_tempo"] / total["acertos"] if total["acertos"] else 0.0
+        }
+    return estatisticas
+
+class PerfilArranque:
+    """Tempo gasto em cada fase do arranque (mostrado com --profile-startup)."""
 
-class ExploradorVirtual:
     def __init__(self):
-        # Inicializar a janela principal
-        self.janela = tk.Tk()
-        self.janela.title("Explorador Virtual")
-        self.janela.geometry("600x800")
+        self.inicio = time.perf_counter()
+        self.fases = []  # (início, duração, thread, nome)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def fase(self, nome):
+        """Mede o bloco `with` como uma fase com este nome."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registar(nome, inicio, time.perf_counter() - inicio)
+
+    def marcar(self, nome):
+        """Regista um instante (fase sem duração)."""
+        self.registar(nome, time.perf_counter(), 0.0)
+
+    def registar(self, nome, inicio, duracao):
+        principal = threading.current_thread() is threading.main_thread()
+        with self.lock:
+            self.fases.append((inicio - self.inicio, duracao, "principal" if principal else "fundo", nome))
+
+    def mostrar(self):
+        print("=== PERFIL DO ARRANQUE ===")
+        print(f"{'Início':>10}{'Duração':>10}  {'Thread':<11}Fase")
+        for inicio, duracao, thread, nome in sorted(self.fases):
+            print(f"{inicio * 1000:>7.1f} ms{duracao * 1000:>7.1f} ms  {thread:<11}{nome}")
+
+class GestorEcras:
+    """
+    Cada ecrã é um Frame criado uma única vez (na primeira visita). Mudar de ecrã
+    esconde o atual com pack_forget, mostra o pedido e chama a função que atualiza
+    o conteúdo. Guarda também quanto tempo demora cada navegação até o Tk desenhar.
+    """
+
+    def __init__(self, janela):
+        self.janela = janela
+        self.definicoes = {}  # nome -> (construir, atualizar)
+        self.frames = {}
+        self.atual = None
+        self.tempos = defaultdict(list)  # nome -> durações (s)
+
+    def registar(self, nome, construir, atualizar=None):
+        """construir() devolve o Frame do ecrã; atualizar(*args) é chamada em cada visita."""
+        self.definicoes[nome] = (construir, atualizar)
+
+    def mostrar(self, nome, *args):
+        """Mostra o ecrã `nome`, criando-o se for a primeira vez."""
+        inicio = time.perf_counter()
+        construir, atualizar = self.definicoes[nome]
+
+        frame = self.frames.get(nome)
+        if frame is None:
+            frame = self.frames[nome] = construir()
+
+        if self.atual != nome:
+            if self.atual is not None:
+                self.frames[self.atual].pack_forget()
+            frame.pack(fill=tk.BOTH, expand=True)
+            self.atual = nome
+
+        if atualizar is not None:
+            atualizar(*args)
+
+        # O desenho é feito nas tarefas "idle" do Tk, que correm antes desta
+        self.janela.after_idle(self.registar_tempo, nome, inicio)
+
+    def registar_tempo(self, nome, inicio):
+        self.tempos[nome].append(time.perf_counter() - inicio)
+
+    def mostrar_tempos(self):
+        """Latência da navegação por ecrã (a primeira visita inclui a criação)."""
+        print("=== NAVEGAÇÃO ENTRE ECRÃS ===")
+        print(f"{'Ecrã':<16}{'Visitas':>8}{'1.ª visita':>12}{'Média':>10}{'Máximo':>10}")
+        for nome, tempos in self.tempos.items():
+            seguintes = tempos[1:] or tempos
+            print(
+                f"{nome:<16}{len(tempos):>8}{tempos[0] * 1000:>9.1f} ms"
+                f"{sum(seguintes) / len(seguintes) * 1000:>7.1f} ms{max(seguintes) * 1000:>7.1f} ms"
+            )
 
-        # Carregar dados dos países
-        self.carregar_dados_paises()
+class ExploradorVirtual:
+    def __init__(self, semente=None):
+        # Semente fixa para todos os jogos (--semente=N), para repetir uma sessão
+        self.semente = semente
+        self.perfil = PerfilArranque()
+
+        # Inicializar a janela principal
+        with self.perfil.fase("janela Tk"):
+            self.janela = tk.Tk()
+            self.janela.title("Explorador Virtual")
+            self.janela.geometry("600x800")
+            self.janela.protocol("WM_DELETE_WINDOW", self.fechar)
+
+        # Registo das rondas para análise posterior
+        self.registo = RegistoEventos()
+
+        # Tarefas em segundo plano (carregamento, imagens da ronda seguinte, palavras-passe)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+        # Os países, o motor do jogo, o PIL e o índice das imagens só são precisos
+        # depois do login: são carregados numa thread enquanto o jogador escreve
+        self.paises = None
+        self.motor = None
+        self.indice_imagens = {}
+        self.imagens_paises = {}  # país -> caminho da imagem (resolvido ao carregar)
+        self.carregamento = self.executor.submit(self.carregar_em_segundo_plano)
 
         # Carregar/criar ficheiro de utilizadores
-        self.carregar_utilizadores()
+        self.gravacao_agendada = None
+        with self.perfil.fase("utilizadores"):
+            self.carregar_utilizadores()
 
-        # Variáveis de jogo
-        self.pontos = 0
-        self.paises_ja_mostrados = []
-        self.pais_atual = None
-        self.pistas_dadas = 0
+        # Variáveis da interface (o estado do jogo está em self.motor)
         self.foto = None
-        self.nivel_selecionado = None
         self.utilizador_atual = None
-        self.tentativas_erradas = 0
         self.mapa_visivel = False
-        self.vidas = 3  # Número de vidas (corações)
 
-        # Dicionário de mapeamento de nomes de países para nomes de arquivos
-        self.criar_mapeamento_imagens()
+        # Cache das imagens já redimensionadas
+        self.cache_imagens = CacheImagens(miniaturas=MiniaturasDisco())
+
+        # Preparação da imagem da ronda seguinte em segundo plano
+        self.imagem_futura = None
+        self.foto_preparada = None  # (país, PhotoImage) pronto a mostrar
+
+        # Verificação das palavras-passe (feita numa thread)
+        self.cache_passwords = CacheVerificacao()
+        self.pedido_login = None
+
+        # Ecrãs: cada um é criado na primeira visita e depois reutilizado
+        self.ecras = GestorEcras(self.janela)
+        self.ecras.registar("login", self.construir_login, self.atualizar_login)
+        self.ecras.registar("registo", self.construir_registo, self.atualizar_registo)
+        self.ecras.registar("menu", self.construir_menu, self.atualizar_menu)
+        self.ecras.registar("classificacao", self.construir_classificacao, self.atualizar_classificacao)
+        self.ecras.registar("jogo", self.criar_interface, self.atualizar_interface)
 
         # Mostrar página de login
-        self.mostrar_login()
+        with self.perfil.fase("ecrã de login"):
+            self.mostrar_login()
+
+        # Mostrar erros do carregamento (ex.: paises.json em falta) assim que acabar
+        self.esperar_resultado(self.carregamento, self.concluir_carregamento)
+
+    def carregar_em_segundo_plano(self):
+        """Carrega o que não é preciso para o login. Corre numa thread; devolve (países, motor)."""
+        with self.perfil.fase("importar PIL"):
+            from PIL import Image  # noqa: F401 (fica pronto para a primeira imagem)
+        with self.perfil.fase("ler paises.json"):
+            paises, hash_dados = carregar_paises('paises.json')
+        with self.perfil.fase("motor do jogo (índices, distâncias, níveis)"):
+            motor = MotorJogo(paises, hash_dados, ao_evento=self.registo.registar)
+        with self.perfil.fase("índice de imagens"):
+            self.criar_mapeamento_imagens()
+            self.resolver_imagens_paises(paises)
+        return paises, motor
+
+    def concluir_carregamento(self, futura):
+        """
+        Recebe os dados carregados em segundo plano (na thread do Tk), esperando
+        por eles se ainda não estiverem prontos. Devolve False se não há dados.
+        """
+        if self.motor is not None:
+            return True
+
+        try:
+            self.paises, self.motor = futura.result()
+        except FileNotFoundError:
+            messagebox.showerror("Erro", "Ficheiro 'paises.json' não encontrado!")
+            self.janela.destroy()
+            return False
+        except json.JSONDecodeError:
+            messagebox.showerror("Erro", "Ficheiro 'paises.json' ou 'niveis.json' está mal formatado!")
+            self.janela.destroy()
+            return False
+        except ValueError as e:
+            # Ex.: niveis.json que não é uma lista de níveis
+            messagebox.showerror("Erro", f"Dados do jogo inválidos: {e}")
+            self.janela.destroy()
+            return False
+        except OSError as e:
+            # Ex.: sem permissão para ler paises.json/niveis.json ou a pasta .cache
+            log_dados.error("Erro ao carregar os dados do jogo: %s", e)
+            messagebox.showerror("Erro", f"Não foi possível ler os dados do jogo: {e}")
+            self.janela.destroy()
+            return False
+
+        self.niveis = self.motor.niveis
+
+        log_dados.info(
+            "Níveis: %s", ", ".join(f"{nome} {len(nivel)}" for nome, nivel in self.niveis.items())
+        )
+        for nome, nivel in self.niveis.items():
+            log_dados.debug("Países %s: %s", nome, list(nivel))
+        return True
+
+    def mostrar_perfil_arranque(self):
+        """--profile-startup: espera pelo carregamento em segundo plano, mostra os tempos e sai."""
+        self.perfil.marcar("login visível")
+        self.esperar_resultado(self.carregamento, self.terminar_perfil_arranque)
+
+    def terminar_perfil_arranque(self, futura):
+        carregado = self.concluir_carregamento(futura)
+        self.perfil.marcar("dados prontos")
+        self.perfil.mostrar()
+        if carregado:
+            self.fechar()
 
     def criar_mapeamento_imagens(self):
-        """Cria um mapeamento entre nomes de países e nomes de arquivos de imagem."""
+        """
+        Cria um mapeamento entre nomes de países e nomes de arquivos de imagem.
+        A pasta é lida uma única vez; depois cada procura é só um acesso ao dicionário.
+        """
         # Verificar quais imagens existem na pasta
-        pasta_imagens = "imagens"
-        if os.path.exists(pasta_imagens):
-            arquivos_existentes = os.listdir(pasta_imagens)
-            print("\n=== IMAGENS DISPONÍVEIS NA PASTA ===")
-            for arquivo in sorted(arquivos_existentes):
-                print(f"  - {arquivo}")
-            print("=" * 40)
-        else:
-            print(f"\n⚠️ AVISO: Pasta '{pasta_imagens}' não encontrada!")
+        if not os.path.isdir(PASTA_IMAGENS):
+            log_imagens.warning("Pasta '%s' não encontrada!", PASTA_IMAGENS)
+            self.indice_imagens = {}
+            return self.indice_imagens
+
+        with os.scandir(PASTA_IMAGENS) as entradas:
+            arquivos_existentes = sorted(e.name for e in entradas if e.is_file())
+
+        # Guardar cada ficheiro com a chave normalizada (sem acentos, espaços, hífens ou underscores).
+        # Se houver vários ficheiros com a mesma chave, fica o da extensão com mais prioridade.
+        # O índice novo só substitui o antigo no fim (pode ser criado numa thread).
+        indice = {}
+        prioridade = {ext: i for i, ext in enumerate(EXTENSOES_IMAGEM)}
+        for arquivo in arquivos_existentes:
+            nome, ext = os.path.splitext(arquivo)
+            if ext not in prioridade:
+                continue
+            chave = self.normalizar_nome_arquivo(nome)[1]
+            atual = indice.get(chave)
+            if atual is None or prioridade[ext] < prioridade[os.path.splitext(atual)[1]]:
+                indice[chave] = os.path.join(PASTA_IMAGENS, arquivo)
+
+        log_imagens.info("%d imagens indexadas em '%s'", len(indice), PASTA_IMAGENS)
+        self.indice_imagens = indice
+        return self.indice_imagens
+
+    def reindexar_imagens(self):
+        """Volta a ler a pasta de imagens (usar quando se adicionam ou removem ficheiros)."""
+        self.criar_mapeamento_imagens()
+        if self.paises is not None:
+            self.resolver_imagens_paises(self.paises)
+        return self.indice_imagens
+
+    def resolver_imagens_paises(self, paises):
+        """
+        Escolhe, uma vez ao carregar os dados, a imagem de cada país: primeiro o ficheiro
+        indicado no campo 'imagem', depois o nome do país e por fim a imagem padrão.
+        Fica None só se nem a imagem padrão existir.
+        """
+        padrao = self.indice_imagens.get("padrao")
+        imagens = {}
+        # Só a coluna 'imagem': nos dados compilados os países não são descodificados
+        for nome, imagem in zip(paises, valores_campo(paises, "imagem")):
+            caminho = None
+            if imagem:
+                # Chave normalizada: 'coreia-do-sul.jpg' encontra 'coreia do sul.jpg'
+                chave = self.normalizar_nome_arquivo(os.path.splitext(imagem)[0])[1]
+                caminho = self.indice_imagens.get(chave)
+            caminho = caminho or self.procurar_imagem(nome)
+
+            if caminho is None:
+                log_imagens.warning(
+                    "Imagem não encontrada para '%s' (campo imagem: %s)%s",
+                    nome, imagem, "; a usar a imagem padrão" if padrao else ""
+                )
+                caminho = padrao
+            imagens[nome] = caminho
+
+        self.imagens_paises = imagens
+        return imagens
+
+    def procurar_imagem(self, nome_pais):
+        """Devolve o caminho da imagem do país (ou None) usando o índice de imagens."""
+        variações = self.normalizar_nome_arquivo(nome_pais)
+
+        # Nome completo normalizado e, em último caso, só a primeira palavra
+        for chave in (variações[1], variações[4]):
+            caminho = self.indice_imagens.get(chave)
+            if caminho:
+                return caminho
+        return None
 
     def normalizar_nome_arquivo(self, nome_pais):
         """
@@ -89,17 +1122,7 @@ class ExploradorVirtual:
         variações = []
         
         # Versão 1: minúsculas, espaços para underscore, sem acentos
-        nome_base = nome_pais.lower()
-        nome_base = nome_base.replace(" ", "_")
-        nome_base = nome_base.replace("-", "_")
-        nome_base = nome_base.replace("'", "")
-        nome_base = nome_base.replace("ã", "a").replace("á", "a").replace("à", "a").replace("â", "a")
-        nome_base = nome_base.replace("é", "e").replace("ê", "e")
-        nome_base = nome_base.replace("í", "i")
-        nome_base = nome_base.replace("ó", "o").replace("ô", "o").replace("õ", "o")
-        nome_base = nome_base.replace("ú", "u").replace("ü", "u")
-        nome_base = nome_base.replace("ç", "c")
-        
+        nome_base = normalizar_texto(nome_pais).translate(TABELA_SEPARADORES_ARQUIVO)
         variações.append(nome_base)
         
         # Versão 2: sem underscores (tudo junto)
@@ -119,57 +1142,40 @@ class ExploradorVirtual:
 
     def carregar_imagem(self, nome_pais):
         """Carrega a imagem do país atual"""
+        from PIL import ImageTk
+
+        # Se a imagem já foi preparada em segundo plano, mostrar logo
+        if self.foto_preparada and self.foto_preparada[0] == nome_pais:
+            self.foto = self.foto_preparada[1]
+            self.foto_preparada = None
+            self.label_imagem.config(image=self.foto, text="")
+            return
+
         try:
-            # Obter variações do nome do arquivo
-            variações = self.normalizar_nome_arquivo(nome_pais)
-            
-            # Extensões possíveis
-            extensões = [".jpg", ".jpeg", ".png", ".JPG", ".JPEG", ".PNG"]
-            
-            imagem_encontrada = False
-            
-            # Tentar cada variação com cada extensão
-            for variação in variações:
-                if imagem_encontrada:
-                    break
-                for ext in extensões:
-                    caminho = f"imagens/{variação}{ext}"
-                    if os.path.exists(caminho):
-                        print(f"✓ Imagem encontrada: {caminho}")
-                        imagem = Image.open(caminho)
-                        imagem = imagem.resize((400, 250), Image.Resampling.LANCZOS)
-                        self.foto = ImageTk.PhotoImage(imagem)
-                        self.label_imagem.config(image=self.foto, text="")
-                        imagem_encontrada = True
-                        break
-            
-            if not imagem_encontrada:
-                # Mostrar quais nomes foram tentados
-                print(f"✗ Imagem não encontrada para '{nome_pais}'")
-                print(f"  Tentativas: {', '.join([v + '.jpg' for v in variações])}")
-                
-                # Tentar carregar imagem padrão
-                caminho_padrao = "imagens/padrao.jpg"
-                if os.path.exists(caminho_padrao):
-                    imagem_padrao = Image.open(caminho_padrao)
-                    imagem_padrao = imagem_padrao.resize((400, 250), Image.Resampling.LANCZOS)
-                    self.foto = ImageTk.PhotoImage(imagem_padrao)
-                    self.label_imagem.config(image=self.foto, text="")
-                    print(f"  → Usando imagem padrão")
-                else:
-                    # Mostrar texto se nem a imagem padrão existir
-                    self.label_imagem.config(
-                        text=f"[Imagem de {nome_pais} não disponível]\n\n💡 Dica: O arquivo deveria chamar-se:\n{variações[0]}.jpg",
-                        font=("Arial", 10, "italic"),
-                        fg="gray",
-                        justify=tk.CENTER
-                    )
-                    print(f"  → Imagem padrão também não encontrada")
-                    
+            # Caminho já resolvido ao carregar os dados (ver resolver_imagens_paises)
+            caminho = self.imagens_paises.get(nome_pais)
+
+            if caminho:
+                log_imagens.debug("Imagem de '%s': %s", nome_pais, caminho)
+                imagem = self.cache_imagens.obter(caminho, TAMANHO_IMAGEM_JOGO)
+                self.foto = ImageTk.PhotoImage(imagem)
+                self.label_imagem.config(image=self.foto, text="")
+            else:
+                # Mostrar texto se nem a imagem padrão existir
+                nome_ficheiro = self.paises[nome_pais]["imagem"] or self.normalizar_nome_arquivo(nome_pais)[0] + ".jpg"
+                self.label_imagem.config(
+                    image="",  # Tirar a imagem anterior (o label é reutilizado)
+                    text=f"[Imagem de {nome_pais} não disponível]\n\n💡 Dica: O arquivo deveria chamar-se:\n{nome_ficheiro}",
+                    font=("Arial", 10, "italic"),
+                    fg="gray",
+                    justify=tk.CENTER
+                )
+
         except Exception as e:
             # Em caso de qualquer erro, mostrar texto
-            print(f"❌ Erro ao carregar imagem: {e}")
+            log_imagens.exception("Erro ao carregar imagem de '%s'", nome_pais)
             self.label_imagem.config(
+                image="",
                 text=f"[Erro ao carregar imagem de {nome_pais}]\n\n{str(e)}",
                 font=("Arial", 10, "italic"),
                 fg="red",
@@ -177,35 +1183,45 @@ class ExploradorVirtual:
             )
 
     def carregar_utilizadores(self):
-        """Carrega ou cria o ficheiro de utilizadores."""
-        try:
-            with open('utilizadores.json', 'r', encoding='utf-8') as f:
-                self.utilizadores = json.load(f)
-        except FileNotFoundError:
-            # Criar ficheiro com utilizador padrão
-            self.utilizadores = {
-                "admin": {
-                    "password": "admin123",
-                    "pontuacao_maxima": 0,
-                    "jogos_completos": 0
-                }
-            }
-            self.guardar_utilizadores()
+        """Abre (ou cria) o armazenamento de utilizadores."""
+        self.utilizadores = abrir_armazem_utilizadores()
 
     def guardar_utilizadores(self):
-        """Guarda os utilizadores no ficheiro."""
-        with open('utilizadores.json', 'w', encoding='utf-8') as f:
-            json.dump(self.utilizadores, f, indent=4, ensure_ascii=False)
+        """Grava já as alterações aos utilizadores."""
+        self.utilizadores.gravar()
+
+    def marcar_utilizadores_alterados(self):
+        """
+        Regista que os utilizadores mudaram, sem gravar já.
+        As alterações acumulam-se e são gravadas de uma vez pelo temporizador,
+        ao voltar ao menu ou ao fechar o jogo.
+        """
+        if self.gravacao_agendada is None:
+            self.gravacao_agendada = self.janela.after(INTERVALO_GRAVACAO_MS, self.gravar_pendentes)
+
+    def gravar_pendentes(self):
+        """Grava os utilizadores se houver alterações por gravar."""
+        if self.gravacao_agendada is not None:
+            try:
+                self.janela.after_cancel(self.gravacao_agendada)
+            except tk.TclError:
+                pass  # A janela já foi fechada
+            self.gravacao_agendada = None
+
+        if self.utilizadores.alterado:
+            try:
+                self.guardar_utilizadores()
+            except (OSError, sqlite3.Error) as e:
+                log_utilizadores.error("Erro ao gravar utilizadores: %s", e)
 
     def mostrar_login(self):
         """Mostra a página de login."""
-        # Limpar janela
-        for widget in self.janela.winfo_children():
-            widget.destroy()
+        self.ecras.mostrar("login")
 
+    def construir_login(self):
+        """Cria os widgets da página de login (uma única vez)."""
         # Frame central
         frame_central = tk.Frame(self.janela, bg="#2C3E50")
-        frame_central.pack(fill=tk.BOTH, expand=True)
 
         # Espaço superior
         tk.Label(frame_central, text="", bg="#2C3E50", height=3).pack()
@@ -249,7 +1265,6 @@ class ExploradorVirtual:
 
         self.entrada_username = tk.Entry(frame_login, width=30, font=("Arial", 12))
         self.entrada_username.pack(pady=5)
-        self.entrada_username.focus()
 
         # Password
         tk.Label(
@@ -281,7 +1296,7 @@ class ExploradorVirtual:
         frame_botoes = tk.Frame(frame_login, bg="#34495E")
         frame_botoes.pack(pady=15)
 
-        tk.Button(
+        self.botao_entrar = tk.Button(
             frame_botoes,
             text="ENTRAR",
             command=self.fazer_login,
@@ -291,7 +1306,8 @@ class ExploradorVirtual:
             padx=20,
             pady=8,
             width=12
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        self.botao_entrar.pack(side=tk.LEFT, padx=5)
 
         tk.Button(
             frame_botoes,
@@ -314,6 +1330,17 @@ class ExploradorVirtual:
             fg="#95A5A6"
         ).pack(side=tk.BOTTOM, pady=20)
 
+        return frame_central
+
+    def atualizar_login(self):
+        """Limpa o formulário de login em cada visita."""
+        self.entrada_username.delete(0, tk.END)
+        self.entrada_password.delete(0, tk.END)
+        self.label_login_erro.config(text="")
+        if self.pedido_login is None:
+            self.botao_entrar.config(state=tk.NORMAL, text="ENTRAR")
+        self.entrada_username.focus()
+
     def fazer_login(self):
         """Processa o login do utilizador."""
         username = self.entrada_username.get().strip()
@@ -323,27 +1350,68 @@ class ExploradorVirtual:
             self.label_login_erro.config(text="⚠️ Preencha todos os campos!")
             return
 
-        if username in self.utilizadores:
-            if self.utilizadores[username]["password"] == password:
-                self.utilizador_atual = username
-                self.label_login_erro.config(text="")
-                self.mostrar_menu_nivel()
-            else:
-                self.label_login_erro.config(text="❌ Palavra-passe incorreta!")
-                self.entrada_password.delete(0, tk.END)
-        else:
+        if self.pedido_login is not None:
+            return  # Já há uma verificação em curso
+
+        dados = self.utilizadores.obter(username)
+        if dados is None:
             self.label_login_erro.config(text="❌ Utilizador não existe!")
             self.entrada_password.delete(0, tk.END)
+            return
+
+        # A derivação da palavra-passe demora ~100 ms: fazer numa thread
+        def verificar_em_segundo_plano():
+            correta, precisa_atualizar = self.cache_passwords.verificar(password, dados["password"])
+            novo_hash = gerar_hash_password(password) if correta and precisa_atualizar else None
+            return correta, novo_hash
+
+        self.label_login_erro.config(text="")
+        self.botao_entrar.config(state=tk.DISABLED)
+        self.pedido_login = self.executor.submit(verificar_em_segundo_plano)
+        self.esperar_resultado(
+            self.pedido_login,
+            lambda futura: self.concluir_login(username, futura),
+            lambda passo: self.botao_entrar.config(text="⏳" + "." * (passo % 4))
+        )
+
+    def concluir_login(self, username, futura):
+        """Recebe o resultado da verificação da palavra-passe (na thread do Tk)."""
+        self.pedido_login = None
+        self.botao_entrar.config(state=tk.NORMAL, text="ENTRAR")
+        if self.ecras.atual != "login":
+            return  # O jogador saiu da página de login entretanto
+
+        correta, novo_hash = futura.result()
+        if not correta:
+            self.label_login_erro.config(text="❌ Palavra-passe incorreta!")
+            self.entrada_password.delete(0, tk.END)
+            return
+
+        if novo_hash:
+            # Palavra-passe antiga (texto simples): passa a ficar protegida
+            self.utilizadores.atualizar(username, password=novo_hash)
+            self.guardar_utilizadores()
+
+        self.utilizador_atual = username
+        self.mostrar_menu_nivel()
+
+    def esperar_resultado(self, futura, ao_terminar, ao_esperar=None, passo=0):
+        """Espera por uma tarefa da thread pool sem bloquear o Tk e chama ao_terminar(futura)."""
+        if futura.done():
+            ao_terminar(futura)
+            return
+        if ao_esperar is not None:
+            ao_esperar(passo)
+        self.janela.after(100, self.esperar_resultado, futura, ao_terminar, ao_esperar, passo + 1)
 
     def mostrar_registo(self):
         """Mostra a página de registo de novo utilizador."""
-        # Limpar janela
-        for widget in self.janela.winfo_children():
-            widget.destroy()
+        self.ecras.mostrar("registo")
 
+    def construir_registo(self):
+        """Cria os widgets da página de registo (uma única vez)."""
         # Frame central
         frame_central = tk.Frame(self.janela, bg="#2C3E50")
-        frame_central.pack(fill=tk.BOTH, expand=True)
 
         # Espaço superior
         tk.Label(frame_central, text="", bg="#2C3E50", height=2).pack()
@@ -372,7 +1440,6 @@ class ExploradorVirtual:
 
         self.entrada_novo_username = tk.Entry(frame_registo, width=30, font=("Arial", 12))
         self.entrada_novo_username.pack(pady=5)
-        self.entrada_novo_username.focus()
 
         # Password
         tk.Label(
@@ -411,7 +1478,7 @@ class ExploradorVirtual:
         frame_botoes = tk.Frame(frame_registo, bg="#34495E")
         frame_botoes.pack(pady=15)
 
-        tk.Button(
+        self.botao_criar_conta = tk.Button(
             frame_botoes,
             text="CRIAR CONTA",
             command=self.criar_conta,
@@ -421,7 +1488,8 @@ class ExploradorVirtual:
             padx=20,
             pady=8,
             width=12
-        ).pack(side=tk.LEFT, padx=5)
+        )
+        self.botao_criar_conta.pack(side=tk.LEFT, padx=5)
 
         tk.Button(
             frame_botoes,
@@ -435,6 +1503,16 @@ class ExploradorVirtual:
             width=12
         ).pack(side=tk.LEFT, padx=5)
 
+        return frame_central
+
+    def atualizar_registo(self):
+        """Limpa o formulário de registo em cada visita."""
+        for entrada in (self.entrada_novo_username, self.entrada_nova_password, self.entrada_confirmar_password):
+            entrada.delete(0, tk.END)
+        self.label_registo_msg.config(text="")
+        self.botao_criar_conta.config(state=tk.NORMAL)
+        self.entrada_novo_username.focus()
+
     def criar_conta(self):
         """Cria uma nova conta de utilizador."""
         username = self.entrada_novo_username.get().strip()
@@ -458,142 +1536,64 @@ class ExploradorVirtual:
             self.entrada_confirmar_password.delete(0, tk.END)
             return
 
-        if username in self.utilizadores:
+        if self.utilizadores.existe(username):
             self.label_registo_msg.config(text="⚠️ Este utilizador já existe!", fg="#E74C3C")
             return
 
-        # Criar novo utilizador
-        self.utilizadores[username] = {
-            "password": password,
-            "pontuacao_maxima": 0,
-            "jogos_completos": 0
-        }
+        # Proteger a palavra-passe numa thread e só depois criar a conta
+        self.botao_criar_conta.config(state=tk.DISABLED)
+        self.label_registo_msg.config(text="⏳ A criar conta...", fg="#ECF0F1")
+        futura = self.executor.submit(gerar_hash_password, password)
+        self.esperar_resultado(futura, lambda f: self.concluir_criar_conta(username, f))
+
+    def concluir_criar_conta(self, username, futura):
+        """Grava a conta nova depois de a palavra-passe estar protegida."""
+        self.botao_criar_conta.config(state=tk.NORMAL)
+        if self.ecras.atual != "registo":
+            return  # O jogador saiu da página de registo entretanto
+
+        # Criar novo utilizador (falha se o nome já existir)
+        if not self.utilizadores.criar(username, futura.result()):
+            self.label_registo_msg.config(text="⚠️ Este utilizador já existe!", fg="#E74C3C")
+            return
         self.guardar_utilizadores()
 
         self.label_registo_msg.config(text="✅ Conta criada com sucesso!", fg="#27AE60")
         self.janela.after(1500, self.mostrar_login)
 
-    def normalizar_para_comparacao(self, nome):
-        """Normaliza nome do país para comparação."""
-        nome = nome.lower().strip()
-        nome = nome.replace('á', 'a').replace('à', 'a').replace('â', 'a').replace('ã', 'a')
-        nome = nome.replace('é', 'e').replace('ê', 'e')
-        nome = nome.replace('í', 'i')
-        nome = nome.replace('ó', 'o').replace('ô', 'o').replace('õ', 'o')
-        nome = nome.replace('ú', 'u').replace('ü', 'u')
-        nome = nome.replace('ç', 'c')
-        return nome
-    
-    def encontrar_pais_no_json(self, nome_desejado):
-        """Encontra o país no JSON mesmo com variações de nome."""
-        nome_normalizado = self.normalizar_para_comparacao(nome_desejado)
-        
-        # Tentar correspondência exata primeiro
-        if nome_desejado in self.paises:
-            return nome_desejado
-        
-        # Tentar correspondência normalizada
-        for pais_json in self.paises.keys():
-            if self.normalizar_para_comparacao(pais_json) == nome_normalizado:
-                return pais_json
-        
-
-    def carregar_dados_paises(self):
-        """Carrega os dados dos países a partir do ficheiro JSON."""
-        try:
-            with open('paises.json', 'r', encoding='utf-8') as f:
-                self.paises = json.load(f)
-
-            # Lista de países para cada nível - TODOS os 20 países
-            paises_faceis_desejados = [
-                'Portugal', 'Espanha', 'França', 'Itália', 'Brasil',
-                'Estados Unidos', 'Inglaterra', 'Alemanha', 'Japão', 'China',
-                'Canadá', 'Austrália', 'México', 'Argentina', 'Rússia',
-                'Índia', 'Coreia do Sul', 'Turquia', 'Egito', 'África do Sul'
-            ]
-
-            paises_medios_desejados = [
-                'Grécia', 'Holanda', 'Suécia', 'Noruega', 'Polónia',
-                'Irlanda', 'Áustria', 'Bélgica', 'Dinamarca', 'Finlândia',
-                'Hungria', 'República Checa', 'Roménia', 'Bulgária', 'Suíça',
-                'Nova Zelândia', 'Tailândia', 'Indonésia', 'Malásia', 'Filipinas',
-                'Colômbia', 'Venezuela', 'Chile', 'Peru', 'Marrocos'
-            ]
-
-            # Encontrar países com busca inteligente
-            facil_encontrados = []
-            for pais_desejado in paises_faceis_desejados:
-                pais_real = self.encontrar_pais_no_json(pais_desejado)
-                if pais_real:
-                    facil_encontrados.append(pais_real)
-                else:
-                    print(f"⚠️  País não encontrado: {pais_desejado}")
-            
-            medio_encontrados = []
-            for pais_desejado in paises_medios_desejados:
-                pais_real = self.encontrar_pais_no_json(pais_desejado)
-                if pais_real:
-                    medio_encontrados.append(pais_real)
-
-            # Configurar níveis
-            self.niveis = {
-                'Fácil': facil_encontrados if facil_encontrados else list(self.paises.keys())[:20],
-                'Médio': medio_encontrados if medio_encontrados else list(self.paises.keys())[20:45],
-                'Difícil': []
-            }
-
-            # Países difíceis = todos os outros
-            paises_faceis_medios = self.niveis['Fácil'] + self.niveis['Médio']
-            self.niveis['Difícil'] = [p for p in self.paises.keys() if p not in paises_faceis_medios]
-
-            # Se Difícil ficou vazio, usar todos
-            if not self.niveis['Difícil']:
-                self.niveis['Difícil'] = list(self.paises.keys())
-
-            print(f"\n=== CONFIGURAÇÃO DOS NÍVEIS ===")
-            print(f"Países Fácil ({len(self.niveis['Fácil'])}): {self.niveis['Fácil']}")
-            print(f"Países Médio ({len(self.niveis['Médio'])}): {self.niveis['Médio']}")
-            print(f"Países Difícil: {len(self.niveis['Difícil'])} países")
-            print("=" * 50)
-
-        except FileNotFoundError:
-            messagebox.showerror("Erro", "Ficheiro 'paises.json' não encontrado!")
-            self.janela.destroy()
-        except json.JSONDecodeError:
-            messagebox.showerror("Erro", "Ficheiro 'paises.json' está mal formatado!")
-            self.janela.destroy()
-
     def mostrar_menu_nivel(self):
         """Mostra o menu de seleção de nível."""
-        # Limpar janela
-        for widget in self.janela.winfo_children():
-            widget.destroy()
+        # Normalmente os dados já estão prontos quando o login termina
+        if not self.concluir_carregamento(self.carregamento):
+            return
+
+        self.ecras.mostrar("menu")
 
+    def construir_menu(self):
+        """Cria os widgets do menu de níveis (uma única vez)."""
         # Frame com fundo colorido
         frame_principal = tk.Frame(self.janela, bg="#ECF0F1")
-        frame_principal.pack(fill=tk.BOTH, expand=True)
 
         # Cabeçalho com info do utilizador
         frame_header = tk.Frame(frame_principal, bg="#3498DB", height=60)
         frame_header.pack(fill=tk.X)
         frame_header.pack_propagate(False)
 
-        tk.Label(
+        self.label_boas_vindas = tk.Label(
             frame_header,
-            text=f"👤 Bem-vindo, {self.utilizador_atual}!",
             font=("Arial", 12, "bold"),
             bg="#3498DB",
             fg="white"
-        ).pack(side=tk.LEFT, padx=20, pady=15)
+        )
+        self.label_boas_vindas.pack(side=tk.LEFT, padx=20, pady=15)
 
-        stats = self.utilizadores[self.utilizador_atual]
-        tk.Label(
+        self.label_estatisticas = tk.Label(
             frame_header,
-            text=f"🏆 Melhor: {stats['pontuacao_maxima']} pts | 🎮 Jogos: {stats['jogos_completos']}",
             font=("Arial", 10),
             bg="#3498DB",
             fg="white"
-        ).pack(side=tk.LEFT, padx=10)
+        )
+        self.label_estatisticas.pack(side=tk.LEFT, padx=10)
 
         tk.Button(
             frame_header,
@@ -624,67 +1624,179 @@ class ExploradorVirtual:
         frame_botoes = tk.Frame(frame_principal, bg="#ECF0F1")
         frame_botoes.pack(pady=20)
 
-        # Botão Fácil
-        tk.Button(
-            frame_botoes,
-            text=f"🌟 FÁCIL 🌟\n({len(self.niveis['Fácil'])} países conhecidos)",
-            command=lambda: self.iniciar_jogo('Fácil'),
-            font=("Arial", 14, "bold"),
-            bg="#90EE90",
-            fg="black",
-            width=22,
-            height=3,
-            padx=10,
-            pady=10
-        ).pack(pady=10)
+        # Um botão grande por nível principal (definidos em niveis.json)
+        for nome, nivel in self.niveis.items():
+            if not nivel.principal:
+                continue
+            tk.Button(
+                frame_botoes,
+                text=f"{nivel.icone} {nome.upper()} {nivel.icone}\n({len(nivel)} {nivel.descricao})",
+                command=lambda n=nome: self.iniciar_jogo(n),
+                font=("Arial", 14, "bold"),
+                bg=nivel.cor,
+                fg=nivel.cor_texto,
+                width=22,
+                height=3,
+                padx=10,
+                pady=10
+            ).pack(pady=10)
+
+        # Níveis extra (por continente, clima, ...) em botões pequenos, numa grelha
+        extras = [(nome, nivel) for nome, nivel in self.niveis.items() if not nivel.principal]
+        if extras:
+            frame_extras = tk.Frame(frame_principal, bg="#ECF0F1")
+            frame_extras.pack(pady=5)
+            for i, (nome, nivel) in enumerate(extras):
+                tk.Button(
+                    frame_extras,
+                    text=f"{nivel.icone} {nome}\n({len(nivel)} {nivel.descricao})",
+                    command=lambda n=nome: self.iniciar_jogo(n),
+                    font=("Arial", 10, "bold"),
+                    bg=nivel.cor,
+                    fg=nivel.cor_texto,
+                    width=14
+                ).grid(row=i // COLUNAS_NIVEIS_EXTRA, column=i % COLUNAS_NIVEIS_EXTRA, padx=4, pady=4)
 
-        # Botão Médio
+        # Botão Classificação
         tk.Button(
-            frame_botoes,
-            text=f"⭐ MÉDIO ⭐\n({len(self.niveis['Médio'])} países com desafio)",
-            command=lambda: self.iniciar_jogo('Médio'),
-            font=("Arial", 14, "bold"),
-            bg="#FFD700",
-            fg="black",
-            width=22,
-            height=3,
-            padx=10,
-            pady=10
+            frame_principal,
+            text="🏆 Classificação",
+            command=self.mostrar_classificacao,
+            font=("Arial", 11, "bold"),
+            bg="#8E44AD",
+            fg="white",
+            padx=15,
+            pady=5
         ).pack(pady=10)
 
-        # Botão Difícil
+        return frame_principal
+
+    def atualizar_menu(self):
+        """Mostra o utilizador e as estatísticas atuais no cabeçalho."""
+        stats = self.utilizadores.obter(self.utilizador_atual)
+        self.label_boas_vindas.config(text=f"👤 Bem-vindo, {self.utilizador_atual}!")
+        self.label_estatisticas.config(
+            text=f"🏆 Melhor: {stats['pontuacao_maxima']} pts | 🎮 Jogos: {stats['jogos_completos']}"
+        )
+
+    def mostrar_classificacao(self, nivel=None):
+        """Mostra os melhores jogadores no geral ou num nível."""
+        self.ecras.mostrar("classificacao", nivel)
+
+    def construir_classificacao(self):
+        """Cria a página da classificação, com as linhas da tabela já feitas (uma única vez)."""
+        frame_principal = tk.Frame(self.janela, bg="#ECF0F1")
+
+        tk.Label(
+            frame_principal,
+            text="🏆 CLASSIFICAÇÃO 🏆",
+            font=("Arial", 20, "bold"),
+            bg="#ECF0F1"
+        ).pack(pady=30)
+
+        # Botões para escolher a classificação
+        frame_filtros = tk.Frame(frame_principal, bg="#ECF0F1")
+        frame_filtros.pack(pady=10)
+
+        self.botoes_classificacao = {}
+        for i, (nome, valor) in enumerate([("Geral", None)] + [(n, n) for n in self.niveis]):
+            botao = tk.Button(
+                frame_filtros,
+                text=nome,
+                command=lambda v=valor: self.mostrar_classificacao(v),
+                font=("Arial", 10, "bold"),
+                bg="#95A5A6",
+                fg="white",
+                padx=10,
+                pady=3,
+                width=8
+            )
+            botao.grid(row=i // COLUNAS_FILTROS, column=i % COLUNAS_FILTROS, padx=3, pady=2)
+            self.botoes_classificacao[valor] = botao
+
+        # Tabela com os melhores
+        frame_tabela = tk.Frame(frame_principal, bg="white", padx=20, pady=15)
+        frame_tabela.pack(pady=20)
+
+        self.label_sem_pontuacoes = tk.Label(
+            frame_tabela,
+            text="Ainda não há pontuações.",
+            font=("Arial", 11, "italic"),
+            bg="white",
+            fg="gray"
+        )
+
+        # Uma linha (posição, nome, pontos) por lugar; as que sobram ficam escondidas
+        self.linhas_classificacao = []
+        for _ in range(TAMANHO_CLASSIFICACAO):
+            linha = tk.Frame(frame_tabela, bg="white")
+            labels = (
+                tk.Label(linha, width=4, anchor="e", font=("Arial", 12, "bold"), bg="white"),
+                tk.Label(linha, width=18, anchor="w", font=("Arial", 12), bg="white"),
+                tk.Label(linha, width=10, anchor="e", font=("Arial", 12), bg="white")
+            )
+            labels[0].pack(side=tk.LEFT)
+            labels[1].pack(side=tk.LEFT, padx=10)
+            labels[2].pack(side=tk.LEFT)
+            self.linhas_classificacao.append((linha, labels))
+
         tk.Button(
-            frame_botoes,
-            text=f"🔥 DIFÍCIL 🔥\n({len(self.niveis['Difícil'])} países)",
-            command=lambda: self.iniciar_jogo('Difícil'),
-            font=("Arial", 14, "bold"),
-            bg="#FF6347",
+            frame_principal,
+            text="VOLTAR",
+            command=self.mostrar_menu_nivel,
+            font=("Arial", 12, "bold"),
+            bg="#95A5A6",
             fg="white",
-            width=22,
-            height=3,
-            padx=10,
-            pady=10
-        ).pack(pady=10)
+            padx=20,
+            pady=8,
+            width=12
+        ).pack(pady=20)
+
+        return frame_principal
+
+    def atualizar_classificacao(self, nivel=None):
+        """Preenche as linhas da tabela com a classificação pedida."""
+        for valor, botao in self.botoes_classificacao.items():
+            botao.config(bg="#3498DB" if valor == nivel else "#95A5A6")
+
+        classificacao = self.utilizadores.classificacao(nivel)
+        if classificacao:
+            self.label_sem_pontuacoes.pack_forget()
+        else:
+            self.label_sem_pontuacoes.pack()
+
+        for posicao, (linha, labels) in enumerate(self.linhas_classificacao, 1):
+            if posicao > len(classificacao):
+                linha.pack_forget()
+                continue
+
+            username, pontos = classificacao[posicao - 1]
+            cor = "#8E44AD" if username == self.utilizador_atual else "black"
+            labels[0].config(text=f"{posicao}.", fg=cor)
+            labels[1].config(text=username, fg=cor)
+            labels[2].config(text=f"{pontos} pts", fg=cor)
+            linha.pack(fill=tk.X)
 
     def iniciar_jogo(self, nivel):
         """Inicia o jogo com o nível selecionado."""
-        self.nivel_selecionado = nivel
-        self.pontos = 0
-        self.paises_ja_mostrados = []
-        self.tentativas_erradas = 0
+        # Com --semente a ordem tem de depender só da semente (para repetir o jogo),
+        # por isso a seleção adaptativa, que depende do histórico guardado, fica desligada
+        historico = None
+        if SELECAO_ADAPTATIVA and self.semente is None:
+            historico = self.utilizadores.historico_paises(self.utilizador_atual)
+        self.motor.iniciar_jogo(nivel, self.utilizador_atual, self.semente, historico)
         self.mapa_visivel = False
-        self.vidas = 3  # Resetar vidas
+        self.cancelar_preparacao()
 
-        # Limpar janela e criar interface do jogo
-        for widget in self.janela.winfo_children():
-            widget.destroy()
-
-        self.criar_interface()
+        # Mostrar a interface do jogo (criada só no primeiro jogo)
+        self.ecras.mostrar("jogo")
 
     def criar_interface(self):
-        """Cria a interface gráfica do jogo."""
+        """Cria a interface gráfica do jogo (uma única vez; ver atualizar_interface)."""
+        ecra = tk.Frame(self.janela)
+
         # Frame superior com título e info
-        frame_topo = tk.Frame(self.janela)
+        frame_topo = tk.Frame(ecra)
         frame_topo.pack(pady=5)
 
         # Título
@@ -698,34 +1810,35 @@ class ExploradorVirtual:
         frame_info = tk.Frame(frame_topo)
         frame_info.pack()
 
-        tk.Label(
+        self.label_jogador = tk.Label(
             frame_info,
-            text=f"👤 {self.utilizador_atual}",
             font=("Arial", 10, "bold"),
             fg="purple"
-        ).pack(side=tk.LEFT, padx=10)
+        )
+        self.label_jogador.pack(side=tk.LEFT, padx=10)
 
-        tk.Label(
+        self.label_nivel = tk.Label(
             frame_info,
-            text=f"Nível: {self.nivel_selecionado}",
             font=("Arial", 11, "bold"),
             fg="blue"
-        ).pack(side=tk.LEFT, padx=10)
+        )
+        self.label_nivel.pack(side=tk.LEFT, padx=10)
 
         self.label_pontos = tk.Label(
             frame_info,
-            text=f"Pontos: {self.pontos}",
             font=("Arial", 11, "bold"),
             fg="green"
         )
         self.label_pontos.pack(side=tk.LEFT, padx=10)
 
-        # Frame para os corações (vidas)
+        # Frame para os corações (vidas): um label por vida, atualizado no lugar
         self.frame_vidas = tk.Frame(frame_info)
         self.frame_vidas.pack(side=tk.LEFT, padx=10)
-
-        # Atualizar corações
-        self.atualizar_vidas()
+        self.labels_vidas = []
+        for _ in range(MotorJogo.VIDAS_INICIAIS):
+            label = tk.Label(self.frame_vidas, font=("Arial", 12))
+            label.pack(side=tk.LEFT)
+            self.labels_vidas.append(label)
 
         # Botão para voltar ao menu
         tk.Button(
@@ -740,7 +1853,7 @@ class ExploradorVirtual:
         ).pack(side=tk.LEFT, padx=10)
 
         # Frame para a imagem
-        self.frame_imagem = tk.Frame(self.janela, width=400, height=250)
+        self.frame_imagem = tk.Frame(ecra, width=400, height=250)
         self.frame_imagem.pack(pady=5)
         self.frame_imagem.pack_propagate(False)
 
@@ -748,18 +1861,18 @@ class ExploradorVirtual:
         self.label_imagem.pack()
 
         # Labels para pistas
-        self.label_pista1 = tk.Label(self.janela, text="", font=("Arial", 10))
+        self.label_pista1 = tk.Label(ecra, text="", font=("Arial", 10))
         self.label_pista1.pack(pady=2)
 
-        self.label_pista2 = tk.Label(self.janela, text="", font=("Arial", 10))
+        self.label_pista2 = tk.Label(ecra, text="", font=("Arial", 10))
         self.label_pista2.pack(pady=2)
 
-        self.label_pista3 = tk.Label(self.janela, text="", font=("Arial", 10))
+        self.label_pista3 = tk.Label(ecra, text="", font=("Arial", 10))
         self.label_pista3.pack(pady=2)
 
         # Botão para mostrar/esconder o mapa-mundi
         self.botao_mapa_mundi = tk.Button(
-            self.janela,
+            ecra,
             text="🗺️ Ver Mapa-Mundi",
             command=self.toggle_mapa_mundi,
             font=("Arial", 10, "bold"),
@@ -773,7 +1886,7 @@ class ExploradorVirtual:
 
         # Botão para ampliar o mapa
         self.botao_ampliar_mapa = tk.Button(
-            self.janela,
+            ecra,
             text="🔍 Ampliar Mapa",
             command=self.ampliar_mapa,
             font=("Arial", 10, "bold"),
@@ -787,18 +1900,32 @@ class ExploradorVirtual:
 
         # Entrada para o nome do país
         tk.Label(
-            self.janela,
+            ecra,
             text="Escreve o nome do país:",
             font=("Arial", 10)
         ).pack(pady=5)
 
-        self.entrada = tk.Entry(self.janela, width=30, font=("Arial", 11))
+        self.entrada = tk.Entry(ecra, width=30, font=("Arial", 11))
         self.entrada.pack(pady=5)
         self.entrada.bind('<Return>', lambda e: self.verificar())
+        self.entrada.bind('<KeyRelease>', self.agendar_sugestoes)
+        self.entrada.bind('<Down>', self.ir_para_sugestoes)
+
+        # Lista de sugestões (só aparece quando há nomes para sugerir)
+        self.lista_sugestoes = tk.Listbox(
+            ecra,
+            width=30,
+            height=MAX_SUGESTOES,
+            font=("Arial", 10),
+            activestyle="none"
+        )
+        self.lista_sugestoes.bind('<ButtonRelease-1>', self.escolher_sugestao)
+        self.lista_sugestoes.bind('<Return>', self.escolher_sugestao)
+        self.pedido_sugestoes = None
 
         # Botão para verificar a resposta
         self.botao_verificar = tk.Button(
-            self.janela,
+            ecra,
             text="VERIFICAR",
             command=self.verificar,
             font=("Arial", 11, "bold"),
@@ -811,7 +1938,7 @@ class ExploradorVirtual:
 
         # Label para mostrar o resultado
         self.label_resultado = tk.Label(
-            self.janela,
+            ecra,
             text="",
             font=("Arial", 10, "bold"),
             height=3
@@ -819,7 +1946,7 @@ class ExploradorVirtual:
         self.label_resultado.pack(pady=5)
 
         # Frame para o botão próximo
-        self.frame_botao_proximo = tk.Frame(self.janela)
+        self.frame_botao_proximo = tk.Frame(ecra)
         self.frame_botao_proximo.pack(pady=5)
 
         # Botão para passar ao próximo país
@@ -834,37 +1961,91 @@ class ExploradorVirtual:
             pady=8
         )
 
+        return ecra
+
+    def atualizar_interface(self):
+        """Prepara a interface para um jogo novo e começa a primeira ronda."""
+        self.label_jogador.config(text=f"👤 {self.utilizador_atual}")
+        self.label_nivel.config(text=f"Nível: {self.motor.nivel}")
+        self.label_pontos.config(text=f"Pontos: {self.motor.pontos}")
+        self.atualizar_vidas()
+
         # Iniciar a primeira ronda
         self.nova_ronda()
 
+    def agendar_sugestoes(self, evento=None):
+        """Espera que o jogador pare de escrever antes de atualizar as sugestões."""
+        if evento is not None and evento.keysym in ("Return", "Down", "Up", "Escape"):
+            if evento.keysym == "Escape":
+                self.esconder_sugestoes()
+            return
+
+        if self.pedido_sugestoes is not None:
+            self.janela.after_cancel(self.pedido_sugestoes)
+        self.pedido_sugestoes = self.janela.after(ATRASO_SUGESTOES_MS, self.atualizar_sugestoes)
+
+    def atualizar_sugestoes(self):
+        """Mostra os países cujo nome começa pelo que está escrito."""
+        self.pedido_sugestoes = None
+        if self.ecras.atual != "jogo":
+            return
+
+        sugestoes = self.motor.indice_prefixos.procurar(self.normalizar_nome_pais(self.entrada.get()))
+        if not sugestoes:
+            self.esconder_sugestoes()
+            return
+
+        self.lista_sugestoes.delete(0, tk.END)
+        for pais in sugestoes:
+            self.lista_sugestoes.insert(tk.END, pais)
+        self.lista_sugestoes.config(height=len(sugestoes))
+        if not self.lista_sugestoes.winfo_ismapped():
+            self.lista_sugestoes.pack(after=self.entrada, pady=(0, 5))
+
+    def esconder_sugestoes(self):
+        """Esconde a lista de sugestões e cancela atualizações pendentes."""
+        if self.pedido_sugestoes is not None:
+            self.janela.after_cancel(self.pedido_sugestoes)
+            self.pedido_sugestoes = None
+        self.lista_sugestoes.pack_forget()
+
+    def ir_para_sugestoes(self, evento=None):
+        """Seta para baixo: passa para a lista de sugestões."""
+        if self.lista_sugestoes.winfo_ismapped() and self.lista_sugestoes.size() > 0:
+            self.lista_sugestoes.focus()
+            self.lista_sugestoes.selection_clear(0, tk.END)
+            self.lista_sugestoes.selection_set(0)
+            self.lista_sugestoes.activate(0)
+        return "break"
+
+    def escolher_sugestao(self, evento=None):
+        """Copia a sugestão escolhida para a caixa de texto."""
+        selecao = self.lista_sugestoes.curselection()
+        if not selecao:
+            return
+
+        pais = self.lista_sugestoes.get(selecao[0])
+        self.entrada.delete(0, tk.END)
+        self.entrada.insert(0, pais)
+        self.esconder_sugestoes()
+        self.entrada.focus()
+
     def atualizar_vidas(self):
         """Atualiza a exibição dos corações (vidas)."""
-        # Limpar corações atuais
-        for widget in self.frame_vidas.winfo_children():
-            widget.destroy()
-
-        # Adicionar corações com base nas vidas restantes
-        for i in range(self.vidas):
-            tk.Label(
-                self.frame_vidas,
-                text="❤️",
-                font=("Arial", 12),
-                fg="red"
-            ).pack(side=tk.LEFT)
-
-        for i in range(3 - self.vidas):
-            tk.Label(
-                self.frame_vidas,
-                text="💔",
-                font=("Arial", 12),
-                fg="gray"
-            ).pack(side=tk.LEFT)
+        # Corações cheios para as vidas restantes, partidos para as perdidas
+        for i, label in enumerate(self.labels_vidas):
+            if i < self.motor.vidas:
+                label.config(text="❤️", fg="red")
+            else:
+                label.config(text="💔", fg="gray")
 
     def voltar_menu(self):
         """Volta ao menu e atualiza estatísticas."""
-        if self.pontos > self.utilizadores[self.utilizador_atual]["pontuacao_maxima"]:
-            self.utilizadores[self.utilizador_atual]["pontuacao_maxima"] = self.pontos
-            self.guardar_utilizadores()
+        # Atualiza os recordes (do nível e geral) e as classificações
+        self.utilizadores.registar_pontuacao(self.utilizador_atual, self.motor.nivel, self.motor.pontos)
+
+        # Gravar tudo o que ficou pendente durante o jogo
+        self.gravar_pendentes()
 
         self.mostrar_menu_nivel()
 
@@ -872,7 +2053,7 @@ class ExploradorVirtual:
         """Mostra ou esconde o mapa-mundi."""
         if self.mapa_visivel:
             # Se o mapa estiver visível, esconde-o e mostra a imagem do país
-            self.carregar_imagem(self.pais_atual)
+            self.carregar_imagem(self.motor.pais_atual)
             self.botao_ampliar_mapa.config(state=tk.DISABLED)
             self.mapa_visivel = False
             self.botao_mapa_mundi.config(text="🗺️ Ver Mapa-Mundi")
@@ -885,22 +2066,25 @@ class ExploradorVirtual:
 
     def mostrar_mapa_mundi(self):
         """Mostra a imagem estática do mapa-mundi."""
+        from PIL import ImageTk
+
         try:
             caminho = "imagens/mapa_mundo.jpg"
             if os.path.exists(caminho):
-                imagem = Image.open(caminho)
-                imagem = imagem.resize((400, 250), Image.Resampling.LANCZOS)
+                imagem = self.cache_imagens.obter(caminho, TAMANHO_IMAGEM_JOGO)
                 self.foto = ImageTk.PhotoImage(imagem)
                 self.label_imagem.config(image=self.foto, text="")
             else:
                 self.label_imagem.config(
+                    image="",
                     text="[Imagem 'mapa_mundo.jpg' não encontrada]",
                     font=("Arial", 12, "italic"),
                     fg="red"
                 )
         except Exception as e:
-            print(f"Erro ao carregar mapa-mundi: {e}")
+            log_imagens.exception("Erro ao carregar mapa-mundi")
             self.label_imagem.config(
+                image="",
                 text=f"[Erro ao carregar mapa-mundi: {e}]",
                 font=("Arial", 10, "italic"),
                 fg="red"
@@ -908,21 +2092,18 @@ class ExploradorVirtual:
 
     def ampliar_mapa(self):
         """Abre o mapa-mundi numa janela maior."""
+        from PIL import ImageTk
+
         try:
             caminho = "imagens/mapa_mundo.jpg"
             if os.path.exists(caminho):
-                imagem = Image.open(caminho)
+                # Largura de 800 px com a altura proporcional (vem da cache/miniatura)
+                imagem = self.cache_imagens.obter(caminho, TAMANHO_MAPA_AMPLIADO)
 
                 # Criar uma nova janela para mostrar o mapa ampliado
                 janela_mapa = tk.Toplevel(self.janela)
                 janela_mapa.title("Mapa-Mundi Ampliado")
 
-                # Ajustar o tamanho da janela
-                largura, altura = imagem.size
-                nova_largura = 800
-                nova_altura = int(altura * (nova_largura / largura))
-                imagem = imagem.resize((nova_largura, nova_altura), Image.Resampling.LANCZOS)
-
                 foto_ampliada = ImageTk.PhotoImage(imagem)
 
                 label_mapa_ampliado = tk.Label(janela_mapa, image=foto_ampliada)
@@ -946,68 +2127,62 @@ class ExploradorVirtual:
             messagebox.showerror("Erro", f"Erro ao ampliar mapa: {e}")
 
     def abrir_localizacao_no_mapa(self):
-        """Abre o Google Maps com a localização exata do país atual."""
-        if self.vidas <= 0:
+        """
+        Abre o Google Maps com a localização exata do país atual.
+        Devolve False se o jogo acabou (sem vidas).
+        """
+        if self.motor.sem_vidas:
             messagebox.showwarning("Sem Vidas", "Não tens mais vidas para usar a localização exata!")
             self.game_over()
-            return
+            return False
 
-        if self.pais_atual and self.pais_atual in self.paises:
-            lat, lon = self.paises[self.pais_atual]["coordenadas"]
-            url = f"https://www.google.com/maps?q={lat},{lon}"
-            webbrowser.open(url)
+        # Reduzir uma vida
+        coordenadas = self.motor.usar_localizacao()
+        if coordenadas is None:
+            messagebox.showwarning("Aviso", "Não há um país selecionado para mostrar no mapa.")
+            return True
 
-            # Reduzir uma vida
-            self.vidas -= 1
-            self.atualizar_vidas()
+        lat, lon = coordenadas
+        url = f"https://www.google.com/maps?q={lat},{lon}"
+        import webbrowser
+        webbrowser.open(url)
+        self.atualizar_vidas()
 
-            if self.vidas <= 0:
-                messagebox.showwarning("Sem Vidas", "Perdeu todas as vidas! Game Over!")
-                self.game_over()
-        else:
-            messagebox.showwarning("Aviso", "Não há um país selecionado para mostrar no mapa.")
+        if self.motor.sem_vidas:
+            messagebox.showwarning("Sem Vidas", "Perdeu todas as vidas! Game Over!")
+            self.game_over()
+            return False
+        return True
 
     def game_over(self):
         """Termina o jogo e mostra mensagem de Game Over."""
-        messagebox.showinfo("Game Over", f"Game Over! Pontuação final: {self.pontos}")
+        messagebox.showinfo("Game Over", f"Game Over! Pontuação final: {self.motor.pontos}")
         self.voltar_menu()
 
     def nova_ronda(self):
         """Inicia uma nova ronda do jogo."""
-        # Selecionar país do nível escolhido
-        paises_nivel = self.niveis[self.nivel_selecionado]
-
-        # Remover países já mostrados
-        paises_disponiveis = [p for p in paises_nivel if p not in self.paises_ja_mostrados and p in self.paises]
-
         # Se já mostrámos todos os países do nível, mostrar mensagem e voltar ao menu
-        if not paises_disponiveis:
-            messagebox.showinfo("Fim do nível", f"Parabéns! Completaste o nível {self.nivel_selecionado}!")
+        if self.motor.nova_ronda() is None:
+            messagebox.showinfo("Fim do nível", f"Parabéns! Completaste o nível {self.motor.nivel}!")
             self.voltar_menu()
             return
 
-        # Escolher país aleatório
-        self.pais_atual = random.choice(paises_disponiveis)
-        self.paises_ja_mostrados.append(self.pais_atual)
-
-        print(f"\n=== NOVA RONDA ===")
-        print(f"País escolhido: {self.pais_atual}")
-        print(f"Países já mostrados: {len(self.paises_ja_mostrados)}/{len(paises_nivel)}")
-
-        info = self.paises[self.pais_atual]
+        total = len(self.niveis[self.motor.nivel])
+        log_jogo.debug(
+            "Nova ronda: %s (%d/%d países mostrados)",
+            self.motor.pais_atual, total - len(self.motor.baralho), total
+        )
 
         # Carregar imagem
-        self.carregar_imagem(self.pais_atual)
-
-        # Resetar pistas
-        self.pistas_dadas = 0
+        self.carregar_imagem(self.motor.pais_atual)
 
         # Mostrar a primeira pista
-        self.label_pista1.config(text=f"PISTA 1: Continente - {info['continente']}")
+        self.label_pista1.config(text=f"PISTA 1: {self.motor.pista(1)}")
         self.label_pista2.config(text="")
         self.label_pista3.config(text="")
 
         # Limpar campos
+        self.esconder_sugestoes()
         self.entrada.delete(0, tk.END)
         self.entrada.config(state='normal')
         self.botao_verificar.config(state='normal')
@@ -1016,52 +2191,68 @@ class ExploradorVirtual:
         # Esconder botão próximo
         self.botao_proximo.pack_forget()
 
-        # Resetar contagem de tentativas erradas
-        self.tentativas_erradas = 0
         self.mapa_visivel = False
         self.botao_mapa_mundi.config(text="🗺️ Ver Mapa-Mundi")
         self.botao_ampliar_mapa.config(state=tk.DISABLED)
 
         self.entrada.focus()
 
-    def mostrar_pista_extra(self):
-        """Mostra pistas adicionais quando o jogador erra."""
-        info = self.paises[self.pais_atual]
+        # Escolher já o país seguinte e preparar a imagem enquanto o jogador responde
+        self.preparar_proxima_ronda()
+
+    def preparar_proxima_ronda(self):
+        """Escolhe o país da próxima ronda e carrega a imagem numa thread."""
+        proximo_pais = self.motor.escolher_proximo_pais()
+        if proximo_pais is None:
+            return
+
+        caminho = self.imagens_paises.get(proximo_pais)
+        if not caminho:
+            return
+
+        self.imagem_futura = self.executor.submit(self.cache_imagens.obter, caminho, TAMANHO_IMAGEM_JOGO)
+        self.janela.after(50, self.receber_imagem_preparada, proximo_pais, self.imagem_futura)
+
+    def receber_imagem_preparada(self, pais, futura):
+        """Passa a imagem preparada para a thread do Tk (PhotoImage só pode ser criado aqui)."""
+        if futura is not self.imagem_futura:
+            # Entretanto o jogo mudou; esta imagem já não interessa
+            return
+        if not futura.done():
+            self.janela.after(50, self.receber_imagem_preparada, pais, futura)
+            return
 
-        if self.pistas_dadas == 0:
-            self.label_pista2.config(text=f"PISTA 2: Clima - {info['clima']}")
-            self.pistas_dadas = 1
-        elif self.pistas_dadas == 1 and 'animais' in info and len(info['animais']) > 0:
-            self.label_pista3.config(text=f"PISTA 3: Animal - {info['animais'][0]}")
-            self.pistas_dadas = 2
+        self.imagem_futura = None
+        from PIL import ImageTk
+        try:
+            self.foto_preparada = (pais, ImageTk.PhotoImage(futura.result()))
+        except Exception as e:
+            # A ronda seguinte tenta outra vez de forma normal
+            log_imagens.warning("Erro ao preparar imagem de %s: %s", pais, e)
+
+    def cancelar_preparacao(self):
+        """Descarta a preparação em curso (ex.: ao começar um jogo novo)."""
+        if self.imagem_futura is not None:
+            self.imagem_futura.cancel()
+        self.imagem_futura = None
+        self.foto_preparada = None
+
+    def mostrar_pista_extra(self, pista):
+        """Mostra a pista adicional (número, texto) dada pelo motor quando o jogador erra."""
+        if pista is None:
+            return
+        numero, texto = pista
+        label = self.label_pista2 if numero == 2 else self.label_pista3
+        label.config(text=f"PISTA {numero}: {texto}")
 
     def normalizar_nome_pais(self, nome):
         """Normaliza o nome do país para comparação (remove acentos, converte case)."""
-        nome = nome.strip().lower()
-        # Remover acentos
-        nome = nome.replace('á', 'a').replace('à', 'a').replace('â', 'a').replace('ã', 'a')
-        nome = nome.replace('é', 'e').replace('ê', 'e')
-        nome = nome.replace('í', 'i')
-        nome = nome.replace('ó', 'o').replace('ô', 'o').replace('õ', 'o')
-        nome = nome.replace('ú', 'u').replace('ü', 'u')
-        nome = nome.replace('ç', 'c')
-        return nome
-    
-    def encontrar_pais_por_nome(self, palpite):
-        """Encontra o país no dicionário considerando variações do nome."""
-        palpite_normalizado = self.normalizar_nome_pais(palpite)
-        
-        # Verificar correspondência exata primeiro
-        for pais in self.paises.keys():
-            if self.normalizar_nome_pais(pais) == palpite_normalizado:
-                return pais
-        
-        # Se não encontrar, retornar None
-        return None
+        return normalizar_texto(nome)
 
     def verificar(self):
         """Verifica a resposta do jogador."""
         palpite_original = self.entrada.get().strip()
+        self.esconder_sugestoes()
 
         if not palpite_original:
             return
@@ -1069,17 +2260,16 @@ class ExploradorVirtual:
         # Formatar o palpite (Title Case)
         palpite = palpite_original.title()
         
-        # Encontrar o país correspondente
-        pais_encontrado = self.encontrar_pais_por_nome(palpite)
+        # As regras (pontos, pistas, tentativas) são aplicadas pelo motor
+        resultado = self.motor.verificar(palpite)
+        self.label_pontos.config(text=f"Pontos: {self.motor.pontos}")
+        self.guardar_historico_pais(resultado)
 
-        if pais_encontrado and pais_encontrado == self.pais_atual:
+        if resultado["resultado"] == "correto":
             # Resposta correta
-            self.pontos += 1000
-            self.label_pontos.config(text=f"Pontos: {self.pontos}")
-
-            info = self.paises[self.pais_atual]
+            info = self.paises[self.motor.pais_atual]
             self.label_resultado.config(
-                text=f"*** CORRETO! ***\nEra {self.pais_atual}!\nCapital: {info['capital']}",
+                text=f"*** CORRETO! ***\nEra {self.motor.pais_atual}!\nCapital: {info['capital']}",
                 fg="green"
             )
 
@@ -1090,62 +2280,171 @@ class ExploradorVirtual:
             # Mostrar botão "Próximo País"
             self.botao_proximo.pack()
 
-            # Incrementar jogos completos
-            self.utilizadores[self.utilizador_atual]["jogos_completos"] += 1
-            self.guardar_utilizadores()
-
-            # Resetar contagem de tentativas erradas
-            self.tentativas_erradas = 0
+            # Incrementar jogos completos (gravado mais tarde, junto com outras alterações)
+            self.utilizadores.incrementar(self.utilizador_atual, "jogos_completos")
+            self.marcar_utilizadores_alterados()
 
-        elif pais_encontrado:
+        elif resultado["resultado"] == "errado":
             # País válido, mas errado
-            coord1 = tuple(self.paises[pais_encontrado]['coordenadas'])
-            coord2 = tuple(self.paises[self.pais_atual]['coordenadas'])
-            dist = calcular_distancia(coord1, coord2)
-            pts = calcular_pontos(dist)
-            self.pontos += pts
-
-            self.label_pontos.config(text=f"Pontos: {self.pontos}")
+            pais_encontrado = resultado["pais"]
+            dist = resultado["distancia"]
+            pts = resultado["pontos"]
             self.label_resultado.config(
                 text=f"Não é {pais_encontrado}!\nDistância: {dist:.0f} km\n(+{pts} pontos)",
                 fg="red"
             )
 
-            # Incrementar contagem de tentativas erradas
-            self.tentativas_erradas += 1
-
             # Se errar 10 vezes, abrir o mapa com a localização exata
-            if self.tentativas_erradas >= 10:
-                self.abrir_localizacao_no_mapa()
+            if resultado["abrir_mapa"]:
+                if not self.abrir_localizacao_no_mapa():
+                    return  # Game over: o ecrã do jogo já foi fechado
                 self.label_resultado.config(
                     text=f"Não é {pais_encontrado}!\nDistância: {dist:.0f} km\n(+{pts} pontos)\n🗺️ A localização exata foi aberta no navegador!",
                     fg="red"
                 )
-                self.tentativas_erradas = 0  # Resetar contagem
 
             # Mostrar pista extra
-            self.mostrar_pista_extra()
+            self.mostrar_pista_extra(resultado["pista"])
 
             self.entrada.delete(0, tk.END)
             self.entrada.focus()
 
         else:
-            # País não existe
-            self.label_resultado.config(
-                text=f"'{palpite}' não está na lista!\n💡 Dica: Verifica a ortografia",
-                fg="orange"
-            )
+            # País não existe: ver se é um erro de escrita
+            sugestao = resultado["sugestao"]
             self.entrada.delete(0, tk.END)
+
+            if sugestao:
+                self.label_resultado.config(
+                    text=f"'{palpite}' não está na lista!\n💡 Querias dizer '{sugestao}'? (Enter para confirmar)",
+                    fg="orange"
+                )
+                self.entrada.insert(0, sugestao)
+            else:
+                self.label_resultado.config(
+                    text=f"'{palpite}' não está na lista!\n💡 Dica: Verifica a ortografia",
+                    fg="orange"
+                )
             self.entrada.focus()
 
+    def guardar_historico_pais(self, resultado):
+        """Guarda o novo estado do país atual no histórico do jogador (seleção adaptativa)."""
+        if self.motor.historico is None or resultado["resultado"] == "desconhecido":
+            return
+        forca, distancia = self.motor.historico[self.motor.pais_atual]
+        self.utilizadores.registar_historico_pais(self.utilizador_atual, self.motor.pais_atual, forca, distancia)
+        self.marcar_utilizadores_alterados()
+
     def proxima_ronda(self):
         """Passa para a próxima ronda do jogo."""
         self.nova_ronda()
 
+    def fechar(self):
+        """Grava o que estiver pendente e fecha a janela."""
+        self.gravar_pendentes()
+        self.janela.destroy()
+
     def iniciar(self):
         """Inicia a aplicação."""
         self.janela.mainloop()
+        self.gravar_pendentes()
+        self.utilizadores.fechar()
+        self.registo.fechar()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def medir_normalizacao(repeticoes=20000):
+    """Micro-benchmark: custo por chamada da normalização antiga (replace encadeados) e da nova."""
+    def normalizar_antigo(nome):
+        nome = nome.strip().lower()
+        nome = nome.replace('á', 'a').replace('à', 'a').replace('â', 'a').replace('ã', 'a')
+        nome = nome.replace('é', 'e').replace('ê', 'e')
+        nome = nome.replace('í', 'i')
+        nome = nome.replace('ó', 'o').replace('ô', 'o').replace('õ', 'o')
+        nome = nome.replace('ú', 'u').replace('ü', 'u')
+        nome = nome.replace('ç', 'c')
+        return nome
+
+    nomes = ["São Tomé e Príncipe", "Moçambique", "Irão", "Côte d'Ivoire", "Portugal", "Suíça"]
+    total = repeticoes * len(nomes)
+
+    def medir(funcao):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            for nome in nomes:
+                funcao(nome)
+        return (time.perf_counter() - inicio) / total * 1e9
+
+    antigo = medir(normalizar_antigo)
+    normalizar_texto.cache_clear()
+    sem_cache = medir(normalizar_texto.__wrapped__)
+    com_cache = medir(normalizar_texto)
+
+    print("=== NORMALIZAÇÃO (ns por chamada) ===")
+    print(f"  replace encadeados:      {antigo:8.0f}")
+    print(f"  translate (sem cache):   {sem_cache:8.0f}")
+    print(f"  translate (com cache):   {com_cache:8.0f}")
+
+def mostrar_analise_eventos(caminho=FICHEIRO_EVENTOS):
+    """Mostra os países mais difíceis segundo o registo de eventos."""
+    if not os.path.exists(caminho):
+        print(f"⚠️ Registo '{caminho}' não encontrado!")
+        return
+
+    estatisticas = analisar_eventos(ler_eventos(caminho))
+    print("=== PAÍSES POR DIFICULDADE ===")
+    print(f"{'País':<32}{'Rondas':>7}{'Acerto':>8}{'Erros/ronda':>13}{'Dist. média':>13}{'Tempo':>8}")
+    for pais, e in sorted(estatisticas.items(), key=lambda item: item[1]["dificuldade"], reverse=True):
+        print(
+            f"{pais:<32}{e['rondas']:>7}{e['taxa_acerto']:>8.0%}{e['dificuldade']:>13.2f}"
+            f"{e['distancia_media']:>10.0f} km{e['tempo_medio']:>7.1f}s"
+        )
+
+def gerar_miniaturas():
+    """Gera antecipadamente as miniaturas de todas as imagens da pasta."""
+    if not os.path.isdir(PASTA_IMAGENS):
+        print(f"⚠️ AVISO: Pasta '{PASTA_IMAGENS}' não encontrada!")
+        return
+
+    with os.scandir(PASTA_IMAGENS) as entradas:
+        caminhos = sorted(
+            e.path for e in entradas
+            if e.is_file() and os.path.splitext(e.name)[1] in EXTENSOES_IMAGEM
+        )
+
+    miniaturas = MiniaturasDisco()
+    geradas = miniaturas.gerar_todas(caminhos, [TAMANHO_IMAGEM_JOGO])
+    # O tamanho ampliado só é usado para o mapa-mundi
+    caminho_mapa = os.path.join(PASTA_IMAGENS, "mapa_mundo.jpg")
+    if os.path.exists(caminho_mapa):
+        geradas += miniaturas.gerar_todas([caminho_mapa], [TAMANHO_MAPA_AMPLIADO])
+    print(f"✓ {geradas} miniaturas geradas em '{PASTA_MINIATURAS}' ({len(caminhos)} imagens)")
 
 if __name__ == "__main__":
-    jogo = ExploradorVirtual()
-    jogo.iniciar()
\ No newline at end of file
+    opcao_log = next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--log=")), None)
+    ouvinte_log = configurar_logging(opcao_log)
+
+    if "--gerar-miniaturas" in sys.argv:
+        gerar_miniaturas()
+    elif "--benchmark-normalizacao" in sys.argv:
+        medir_normalizacao()
+    elif "--calibrar-password" in sys.argv:
+        calibrar_password()
+    elif "--analisar-eventos" in sys.argv:
+        mostrar_analise_eventos()
+    elif "--compilar-paises" in sys.argv:
+        destino = compilar_paises('paises.json')
+        print(f"✓ 'paises.json' compilado para '{destino}' ({os.path.getsize(destino)} bytes)")
+    elif "--migrar-utilizadores" in sys.argv:
+        migrados = migrar_utilizadores_json()
+        print(f"✓ {migrados} utilizadores migrados para '{FICHEIRO_UTILIZADORES_DB}'")
+    else:
+        semente = next((int(a.split("=", 1)[1]) for a in sys.argv if a.startswith("--semente=")), None)
+        jogo = ExploradorVirtual(semente)
+        if "--profile-startup" in sys.argv:
+            jogo.janela.after(0, jogo.mostrar_perfil_arranque)
+        jogo.iniciar()
+        if "--medir-navegacao" in sys.argv:
+            jogo.ecras.mostrar_tempos()
+
+    # Escrever as mensagens que ainda estão na fila
+    ouvinte_log.stop()
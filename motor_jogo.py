@@ -0,0 +1,1326 @@
+"""Regras do Explorador Virtual sem interface gráfica (sem tkinter nem PIL)."""
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Mapping
+from functools import lru_cache
+
+# NumPy só é importado quando é preciso (ver importar_numpy), porque demora ~100 ms
+np = None
+
+log_dados = logging.getLogger("explorador.dados")
+
+PASTA_CACHE = ".cache"  # Dados pré-calculados a partir do paises.json
+RAIO_TERRA_KM = 6371  # Raio médio da Terra em km
+
+# Pontos por distância: (limite em km, pontos) por ordem crescente de distância
+FAIXAS_PONTOS = [(50, 1000), (500, 800), (2000, 500), (5000, 200)]
+PONTOS_MAIS_LONGE = 50
+MAX_SUGESTOES = 6
+# Acima de tantos lugares a matriz N×N não é calculada (2000 lugares = 16 MB em float32,
+# mais os temporários em float64); as distâncias passam a ser calculadas uma a uma
+LIMITE_MATRIZ_DISTANCIAS = 2000
+
+# Seleção adaptativa (repetição espaçada): cada país do histórico de um jogador
+# tem uma força (0 a FORCA_MAXIMA) e a distância média dos palpites errados.
+# Países fracos ou em que o jogador erra por muito saem mais vezes.
+FORCA_MAXIMA = 5
+DISTANCIA_REFERENCIA_KM = 2000  # Esta distância média duplica o peso do país
+SUAVIZACAO_DISTANCIA = 0.3  # Peso de cada palpite novo na média da distância
+
+# Outros nomes aceites para os países (nome alternativo -> nome no paises.json)
+ALIASES_PAISES = {
+    "EUA": "Estados Unidos",
+    "USA": "Estados Unidos",
+    "Estados Unidos da América": "Estados Unidos",
+    "América": "Estados Unidos",
+    "Países Baixos": "Holanda",
+    "Inglaterra": "Reino Unido",
+    "Grã-Bretanha": "Reino Unido",
+    "UK": "Reino Unido",
+    "Chéquia": "República Checa",
+    "Moldávia": "Moldova",
+    "Irã": "Irão",
+    "Vietnã": "Vietname",
+    "Essuatíni": "Suazilândia",
+    "Bielorrússia": "Bielorrussia",
+    "Belarus": "Bielorrussia",
+    "Santa Sé": "Vaticano",
+    "Emirados": "Emirados Árabes Unidos",
+    "Timor Leste": "Timor-Leste",
+    "Guiné Bissau": "Guiné-Bissau",
+}
+
+def remover_acentos_unicode(texto):
+    """Remove acentos decompondo o texto (NFKD) e tirando as marcas combinantes."""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+def criar_tabela_acentos():
+    """
+    Tabela 1 para 1 para str.translate: um texto em que a posição de cada letra latina
+    (Latin-1 e Latin Extended) tem essa letra já sem acento. Indexar um texto é mais
+    rápido do que um dicionário; caracteres depois do fim da tabela ficam iguais.
+    """
+    letras = []
+    for codigo in range(0x250):
+        letra = chr(codigo)
+        sem_acento = remover_acentos_unicode(letra) if codigo >= 0xC0 else letra
+        letras.append(sem_acento if len(sem_acento) == 1 else letra)
+    # Letras que o Unicode não decompõe em letra base + acento
+    for letra, base in {"ø": "o", "Ø": "O", "đ": "d", "Đ": "D", "ł": "l", "Ł": "L", "ı": "i"}.items():
+        letras[ord(letra)] = base
+    return "".join(letras)
+
+TABELA_ACENTOS = criar_tabela_acentos()
+
+# Letras que passam a duas (raras; só vistas se o texto ainda não for ASCII)
+TABELA_LETRAS_DUPLAS = str.maketrans({
+    "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "ß": "ss", "þ": "th", "Þ": "TH"
+})
+
+@lru_cache(maxsize=4096)
+def normalizar_texto(texto):
+    """
+    Passa o texto para minúsculas, sem espaços nas pontas e sem acentos
+    (funciona para qualquer letra acentuada: ã, è, ñ, ö, ...).
+    Texto já em ASCII sai logo; o resto é uma passagem pela tabela 1 para 1.
+    O resultado fica em memória, por isso repetir o mesmo nome não custa nada.
+    """
+    texto = texto.strip().lower()
+    if texto.isascii():
+        return texto
+    texto = texto.translate(TABELA_ACENTOS)
+    if not texto.isascii():
+        texto = texto.translate(TABELA_LETRAS_DUPLAS)
+        if not texto.isascii():
+            # Caracteres fora das tabelas: decomposição Unicode completa
+            texto = remover_acentos_unicode(texto)
+    return texto
+
+def calcular_distancia(ponto1, ponto2):
+    """Calcula a distância entre dois pontos em coordenadas geográficas (em km)."""
+    lat1, lon1 = ponto1
+    lat2, lon2 = ponto2
+    raio_terra = RAIO_TERRA_KM
+
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    diff_lat = math.radians(lat2 - lat1)
+    diff_lon = math.radians(lon2 - lon1)
+
+    a = math.sin(diff_lat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(diff_lon / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return raio_terra * c
+
+def calcular_pontos(distancia_km):
+    """Calcula os pontos com base na distância."""
+    for limite_km, pontos in FAIXAS_PONTOS:
+        if distancia_km < limite_km:
+            return pontos
+    return PONTOS_MAIS_LONGE
+
+def importar_numpy():
+    """Importa o NumPy na primeira utilização. Devolve None se não estiver instalado."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            # Sem NumPy as distâncias são calculadas uma a uma com calcular_distancia
+            return None
+        np = numpy
+    return np
+
+def coordenadas_paises(paises):
+    """
+    (latitude, longitude) de cada país, pela ordem de iteração. Nos dados compilados
+    lê a coluna das coordenadas diretamente, sem descodificar os países.
+    """
+    if isinstance(paises, PaisesCompilados):
+        return paises.lista_coordenadas()
+    return [tuple(info["coordenadas"]) for info in paises.values()]
+
+def valores_campo(paises, campo):
+    """Valor de um campo de texto (ex.: "clima") de cada país, pela ordem de iteração."""
+    if isinstance(paises, PaisesCompilados):
+        return paises.valores(campo)
+    return [info[campo] for info in paises.values()]
+
+class MatrizDistancias:
+    """
+    Distâncias entre todos os pares de países, calculadas de uma vez com NumPy (float32).
+    A matriz fica guardada em .cache/ com o hash do paises.json no nome, por isso só
+    é recalculada quando os dados mudam. Sem NumPy, ou com mais de
+    LIMITE_MATRIZ_DISTANCIAS lugares, cada distância é calculada quando é pedida.
+    """
+
+    def __init__(self, paises, hash_dados=None, pasta_cache=PASTA_CACHE):
+        self.nomes = list(paises)
+        self.indices = {nome: i for i, nome in enumerate(self.nomes)}
+        self.coordenadas = coordenadas_paises(paises)
+        self.matriz = None
+
+        if len(self.nomes) > LIMITE_MATRIZ_DISTANCIAS:
+            log_dados.info(
+                "%d lugares: sem matriz de distâncias (limite %d); distâncias calculadas a pedido",
+                len(self.nomes), LIMITE_MATRIZ_DISTANCIAS
+            )
+            return
+        if importar_numpy() is None:
+            return
+
+        caminho = None
+        if hash_dados:
+            caminho = os.path.join(pasta_cache, f"distancias-{hash_dados[:16]}.npy")
+            self.matriz = self.ler_cache(caminho)
+
+        if self.matriz is None:
+            self.matriz = self.calcular_matriz(self.coordenadas)
+            if caminho:
+                self.guardar_cache(caminho)
+
+    @staticmethod
+    def calcular_matriz(coordenadas):
+        """Haversine vetorizado para todos os pares de coordenadas."""
+        pontos = np.radians(np.asarray(coordenadas, dtype=np.float64).reshape(-1, 2))
+        lat = pontos[:, 0][:, None]
+        lon = pontos[:, 1][:, None]
+
+        a = (np.sin((lat.T - lat) / 2) ** 2
+             + np.cos(lat) * np.cos(lat.T) * np.sin((lon.T - lon) / 2) ** 2)
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(np.clip(1 - a, 0, None)))
+        return (RAIO_TERRA_KM * c).astype(np.float32)
+
+    def ler_cache(self, caminho):
+        """Lê a matriz guardada (None se não existir ou não servir para estes dados)."""
+        try:
+            matriz = np.load(caminho)
+        except (OSError, ValueError):
+            return None
+        if matriz.shape != (len(self.nomes), len(self.nomes)):
+            return None
+        return matriz
+
+    def guardar_cache(self, caminho):
+        """Guarda a matriz no disco (escrita atómica)."""
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            temporario = f"{caminho}.{os.getpid()}.tmp.npy"
+            np.save(temporario, self.matriz)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            log_dados.warning("Não foi possível guardar a matriz de distâncias: %s", e)
+
+    def indice(self, nome):
+        """Índice do país na matriz."""
+        return self.indices[nome]
+
+    def distancia(self, i, j):
+        """Distância em km entre os países com índices i e j."""
+        if self.matriz is not None:
+            return float(self.matriz[i, j])
+        return calcular_distancia(self.coordenadas[i], self.coordenadas[j])
+
+    def pontos(self, i, j):
+        """Distância e pontos (como em calcular_pontos) entre os países i e j."""
+        distancia = self.distancia(i, j)
+        return distancia, calcular_pontos(distancia)
+
+    def distancia_entre(self, pais1, pais2):
+        """Distância em km entre dois países, pelo nome."""
+        return self.distancia(self.indices[pais1], self.indices[pais2])
+
+    def pontos_entre(self, pais1, pais2):
+        """Distância e pontos entre dois países, pelo nome."""
+        return self.pontos(self.indices[pais1], self.indices[pais2])
+
+    def matriz_pontos(self):
+        """Pontos de todos os pares de países de uma vez (precisa da matriz, ver __init__)."""
+        limites = np.array([limite for limite, _ in FAIXAS_PONTOS], dtype=np.float32)
+        valores = np.array([pontos for _, pontos in FAIXAS_PONTOS] + [PONTOS_MAIS_LONGE], dtype=np.int32)
+        # searchsorted com side="right" dá a primeira faixa cujo limite é > distância
+        return valores[np.searchsorted(limites, self.matriz, side="right")]
+
+class IndiceEspacial:
+    """
+    Árvore k-d sobre os pontos convertidos para coordenadas 3D na esfera unitária.
+    A distância em linha reta (corda) cresce com a distância sobre a Terra, por isso
+    os vizinhos mais próximos e as pesquisas por raio dão o mesmo resultado que com
+    calcular_distancia, sem ter de comparar com todos os pontos.
+    Aguenta dezenas de milhares de lugares (cidades, monumentos, ...).
+    """
+
+    TAMANHO_FOLHA = 16
+
+    def __init__(self, pontos):
+        # pontos: dicionário nome -> (latitude, longitude)
+        self.nomes = list(pontos)
+        self.vetores = [self.para_vetor(lat, lon) for lat, lon in pontos.values()]
+        self.raiz = self.construir(list(range(len(self.nomes))))
+
+    @staticmethod
+    def para_vetor(lat, lon):
+        """Converte latitude/longitude (graus) num vetor 3D de comprimento 1."""
+        lat_rad = math.radians(lat)
+        lon_rad = math.radians(lon)
+        return (
+            math.cos(lat_rad) * math.cos(lon_rad),
+            math.cos(lat_rad) * math.sin(lon_rad),
+            math.sin(lat_rad)
+        )
+
+    @staticmethod
+    def corda_para_km(corda):
+        """Converte a distância em linha reta (esfera unitária) em km sobre a superfície."""
+        return RAIO_TERRA_KM * 2 * math.asin(min(1.0, corda / 2))
+
+    @staticmethod
+    def km_para_corda(km):
+        """Converte km sobre a superfície na distância em linha reta na esfera unitária."""
+        return 2 * math.sin(min(math.pi, km / RAIO_TERRA_KM) / 2)
+
+    def construir(self, indices):
+        """Divide os pontos pelo eixo com maior dispersão até as folhas serem pequenas."""
+        if len(indices) <= self.TAMANHO_FOLHA:
+            return indices
+
+        eixo = max(range(3), key=lambda e: (
+            max(self.vetores[i][e] for i in indices) - min(self.vetores[i][e] for i in indices)
+        ))
+        indices.sort(key=lambda i: self.vetores[i][eixo])
+        meio = len(indices) // 2
+        valor = self.vetores[indices[meio]][eixo]
+        return (eixo, valor, self.construir(indices[:meio]), self.construir(indices[meio:]))
+
+    @staticmethod
+    def distancia2(a, b):
+        """Quadrado da distância em linha reta entre dois vetores."""
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+    def mais_proximos(self, lat, lon, k=1, excluir=()):
+        """Os k lugares mais próximos do ponto, como lista de (nome, distância em km)."""
+        alvo = self.para_vetor(lat, lon)
+        excluir = set(excluir)
+        melhores = []  # heap de (-distância², índice) com os k melhores até agora
+
+        def visitar(no):
+            if isinstance(no, list):
+                for i in no:
+                    if self.nomes[i] in excluir:
+                        continue
+                    d2 = self.distancia2(alvo, self.vetores[i])
+                    if len(melhores) < k:
+                        heapq.heappush(melhores, (-d2, i))
+                    elif d2 < -melhores[0][0]:
+                        heapq.heapreplace(melhores, (-d2, i))
+                return
+
+            eixo, valor, esquerda, direita = no
+            diferenca = alvo[eixo] - valor
+            perto, longe = (esquerda, direita) if diferenca < 0 else (direita, esquerda)
+            visitar(perto)
+            # Só vale a pena ver o outro lado se ainda puder ter pontos mais perto
+            if len(melhores) < k or diferenca * diferenca < -melhores[0][0]:
+                visitar(longe)
+
+        if k > 0:
+            visitar(self.raiz)
+        resultado = sorted((-d2, i) for d2, i in melhores)
+        return [(self.nomes[i], self.corda_para_km(math.sqrt(d2))) for d2, i in resultado]
+
+    def no_raio(self, lat, lon, raio_km, excluir=()):
+        """Lugares a menos de raio_km do ponto, do mais perto para o mais longe."""
+        alvo = self.para_vetor(lat, lon)
+        raio2 = self.km_para_corda(raio_km) ** 2
+        excluir = set(excluir)
+        encontrados = []
+
+        def visitar(no):
+            if isinstance(no, list):
+                for i in no:
+                    d2 = self.distancia2(alvo, self.vetores[i])
+                    if d2 <= raio2 and self.nomes[i] not in excluir:
+                        encontrados.append((d2, i))
+                return
+
+            eixo, valor, esquerda, direita = no
+            diferenca = alvo[eixo] - valor
+            perto, longe = (esquerda, direita) if diferenca < 0 else (direita, esquerda)
+            visitar(perto)
+            if diferenca * diferenca <= raio2:
+                visitar(longe)
+
+        visitar(self.raiz)
+        encontrados.sort()
+        return [(self.nomes[i], self.corda_para_km(math.sqrt(d2))) for d2, i in encontrados]
+
+def distancia_edicao(a, b, limite):
+    """
+    Distância de Levenshtein entre a e b, mas desiste cedo: se passar do limite
+    devolve limite + 1 sem acabar as contas.
+    """
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(
+                anterior[j] + 1,             # apagar
+                atual[j - 1] + 1,            # inserir
+                anterior[j - 1] + (ca != cb)  # trocar
+            ))
+        if min(atual) > limite:
+            return limite + 1
+        anterior = atual
+    return anterior[-1]
+
+class IndiceAproximado:
+    """
+    Índice de trigramas para encontrar o nome mais parecido com um palpite mal escrito.
+    Só os nomes que partilham trigramas com o palpite são comparados com a distância
+    de edição, em vez de percorrer a lista inteira.
+    """
+
+    def __init__(self, nomes, candidatos=8):
+        # nomes: dicionário nome normalizado -> nome do país
+        self.nomes = dict(nomes)
+        self.candidatos = candidatos
+        self.trigramas = defaultdict(set)
+        for nome in self.nomes:
+            for trigrama in self.obter_trigramas(nome):
+                self.trigramas[trigrama].add(nome)
+
+    @staticmethod
+    def obter_trigramas(texto):
+        """Trigramas do texto, com espaços nas pontas para dar peso ao início e ao fim."""
+        texto = f"  {texto} "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    @staticmethod
+    def limite_erros(texto):
+        """Número de erros tolerados conforme o tamanho do palpite."""
+        if len(texto) <= 4:
+            return 1
+        if len(texto) <= 8:
+            return 2
+        return 3
+
+    def procurar(self, palpite_normalizado):
+        """Devolve o país mais parecido com o palpite (já normalizado) ou None."""
+        contagem = defaultdict(int)
+        for trigrama in self.obter_trigramas(palpite_normalizado):
+            for nome in self.trigramas.get(trigrama, ()):
+                contagem[nome] += 1
+        if not contagem:
+            return None
+
+        limite = self.limite_erros(palpite_normalizado)
+        melhores = sorted(contagem, key=contagem.get, reverse=True)[:self.candidatos]
+
+        melhor_nome = None
+        melhor_distancia = limite + 1
+        for nome in melhores:
+            distancia = distancia_edicao(palpite_normalizado, nome, limite)
+            if distancia < melhor_distancia:
+                melhor_nome, melhor_distancia = nome, distancia
+
+        return self.nomes[melhor_nome] if melhor_nome is not None else None
+
+class IndicePrefixos:
+    """
+    Lista ordenada de nomes normalizados para o autocompletar.
+    Com bisect encontra-se o primeiro nome com o prefixo e lêem-se só os seguintes,
+    sem percorrer todos os países a cada tecla.
+    """
+
+    def __init__(self, nomes):
+        # nomes: dicionário nome normalizado -> nome do país
+        self.entradas = sorted(nomes.items())
+        self.chaves = [chave for chave, _ in self.entradas]
+
+    def procurar(self, prefixo_normalizado, limite=MAX_SUGESTOES):
+        """Devolve até 'limite' países (sem repetidos) cujo nome começa pelo prefixo."""
+        resultados = []
+        if not prefixo_normalizado:
+            return resultados
+
+        i = bisect_left(self.chaves, prefixo_normalizado)
+        while i < len(self.entradas) and len(resultados) < limite:
+            chave, pais = self.entradas[i]
+            if not chave.startswith(prefixo_normalizado):
+                break
+            if pais not in resultados:
+                resultados.append(pais)
+            i += 1
+        return resultados
+
+# Países de cada nível (os nomes podem ter acentos ou ser aliases)
+FICHEIRO_NIVEIS = "niveis.json"
+
+# Usado se niveis.json não existir: um só nível com todos os países
+NIVEIS_PADRAO = [{"nome": "Todos", "principal": True, "todos": True}]
+
+# Chaves aceites em cada definição de nível (ver niveis.json)
+CAMPOS_NIVEL = {
+    "nome", "principal", "descricao", "icone", "cor", "cor_texto",
+    "paises", "todos", "continentes", "climas", "excluir_niveis", "excluir_paises",
+}
+
+CAMPOS_OBRIGATORIOS = ("continente", "capital", "clima")
+
+def criar_pistas(info):
+    """Textos das pistas de um país: continente, clima e (se houver) o primeiro animal."""
+    pistas = [f"Continente - {info['continente']}", f"Clima - {info['clima']}"]
+    if info["animais"]:
+        pistas.append(f"Animal - {info['animais'][0]}")
+    return tuple(pistas)
+
+def validar_pais(nome, info):
+    """
+    Verifica e normaliza um país do JSON. Devolve o dicionário normalizado e a lista
+    de correções feitas; lança ValueError se o país não puder ser usado.
+    """
+    if not isinstance(info, dict):
+        raise ValueError("não é um objeto")
+
+    correcoes = []
+    normalizado = {}
+
+    # Exatamente [latitude, longitude] em números: "12" ou [true, false] também
+    # se desempacotariam em dois valores, por isso o tipo é verificado antes
+    coordenadas = info.get("coordenadas")
+    if not (
+        isinstance(coordenadas, (list, tuple)) and len(coordenadas) == 2
+        and all(isinstance(valor, (int, float)) and not isinstance(valor, bool) for valor in coordenadas)
+    ):
+        raise ValueError(f"coordenadas inválidas: {coordenadas!r}")
+    lat, lon = (float(valor) for valor in coordenadas)
+    if math.isnan(lat) or math.isnan(lon):
+        raise ValueError(f"coordenadas inválidas: {coordenadas!r}")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"coordenadas fora dos limites: {coordenadas!r}")
+    normalizado["coordenadas"] = [lat, lon]
+
+    for campo in CAMPOS_OBRIGATORIOS:
+        valor = info.get(campo)
+        if not isinstance(valor, str) or not valor.strip():
+            raise ValueError(f"'{campo}' em falta ou vazio")
+        if valor != valor.strip():
+            correcoes.append(f"espaços removidos de '{campo}'")
+        normalizado[campo] = valor.strip()
+
+    animais = info.get("animais", [])
+    if not isinstance(animais, list):
+        correcoes.append("'animais' não é uma lista")
+        animais = []
+    validos = [animal.strip() for animal in animais if isinstance(animal, str) and animal.strip()]
+    if len(validos) != len(animais):
+        correcoes.append("animais inválidos removidos")
+    normalizado["animais"] = validos
+
+    imagem = info.get("imagem")
+    if imagem is not None and (not isinstance(imagem, str) or not imagem.strip()):
+        correcoes.append("'imagem' inválida ignorada")
+        imagem = None
+    normalizado["imagem"] = imagem.strip() if imagem else None
+
+    normalizado["pistas"] = criar_pistas(normalizado)
+    return normalizado, correcoes
+
+def validar_paises(paises):
+    """
+    Validação feita uma vez ao carregar os dados: os países que não podem ser usados
+    são rejeitados e os restantes são normalizados (ver validar_pais), com as pistas
+    já escritas. Assim o código de cada ronda não precisa de verificar nada.
+    """
+    validos = {}
+    for nome, info in paises.items():
+        nome_limpo = nome.strip() if isinstance(nome, str) else ""
+        try:
+            if not nome_limpo:
+                raise ValueError("nome vazio")
+            normalizado, correcoes = validar_pais(nome_limpo, info)
+        except ValueError as e:
+            log_dados.warning("País '%s' rejeitado: %s", nome, e)
+            continue
+
+        if nome_limpo != nome:
+            correcoes.append("espaços removidos do nome")
+        if nome_limpo in validos:
+            log_dados.warning("País '%s' repetido: fica só o primeiro", nome_limpo)
+            continue
+        for correcao in correcoes:
+            log_dados.warning("País '%s' corrigido: %s", nome_limpo, correcao)
+        validos[nome_limpo] = normalizado
+    return validos
+
+# Ficheiro compilado (ver compilar_paises):
+#   cabeçalho | offsets dos textos (uint32, n_textos + 1) | coordenadas (float64, lat/lon)
+#   | colunas nome, continente, capital, clima, imagem (uint32, id do texto)
+#   | início dos animais de cada país (uint32, n + 1) | animais (uint32, id do texto)
+#   | países ordenados pelo nome (uint32, para procura binária) | textos em UTF-8
+# Tudo em little-endian; cada texto diferente aparece uma única vez.
+MAGIA_PAISES = b"EXVPAIS2"  # 2: os países são validados ao compilar
+CABECALHO_PAISES = struct.Struct("<8sIIIQq32s")  # magia, n, n_textos, n_animais, origem (tamanho, mtime), sha256
+COLUNAS_TEXTO = ("nome", "continente", "capital", "clima", "imagem")
+SEM_TEXTO = 0xFFFFFFFF  # Campo em falta
+
+def caminho_compilado(caminho):
+    """paises.json -> paises.bin"""
+    return os.path.splitext(caminho)[0] + ".bin"
+
+def compilar_paises(origem='paises.json', destino=None):
+    """
+    Converte o ficheiro JSON de países no formato binário compacto lido por
+    PaisesCompilados. Devolve o caminho do ficheiro criado.
+    """
+    destino = destino or caminho_compilado(origem)
+    with open(origem, 'rb') as f:
+        conteudo = f.read()
+    estado = os.stat(origem)
+    # Só são guardados países já validados e normalizados
+    paises = validar_paises(json.loads(conteudo.decode('utf-8')))
+
+    textos = {}  # texto -> id (cada texto só é guardado uma vez)
+    def id_texto(texto):
+        if texto is None:
+            return SEM_TEXTO
+        return textos.setdefault(texto, len(textos))
+
+    coordenadas = []
+    colunas = {coluna: [] for coluna in COLUNAS_TEXTO}
+    inicio_animais = [0]
+    animais = []
+    for nome, info in paises.items():
+        coordenadas.extend(float(valor) for valor in info["coordenadas"])
+        colunas["nome"].append(id_texto(nome))
+        for coluna in COLUNAS_TEXTO[1:]:
+            colunas[coluna].append(id_texto(info.get(coluna)))
+        animais.extend(id_texto(animal) for animal in info.get("animais", []))
+        inicio_animais.append(len(animais))
+
+    nomes = list(paises)
+    ordem = sorted(range(len(nomes)), key=lambda i: nomes[i].encode('utf-8'))
+
+    codificados = [texto.encode('utf-8') for texto in textos]
+    offsets = [0]
+    for texto in codificados:
+        offsets.append(offsets[-1] + len(texto))
+
+    n = len(nomes)
+    partes = [
+        CABECALHO_PAISES.pack(
+            MAGIA_PAISES, n, len(textos), len(animais),
+            estado.st_size, estado.st_mtime_ns, hashlib.sha256(conteudo).digest()
+        ),
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        struct.pack(f"<{2 * n}d", *coordenadas),
+        *(struct.pack(f"<{n}I", *colunas[coluna]) for coluna in COLUNAS_TEXTO),
+        struct.pack(f"<{n + 1}I", *inicio_animais),
+        struct.pack(f"<{len(animais)}I", *animais),
+        struct.pack(f"<{n}I", *ordem),
+        b"".join(codificados),
+    ]
+
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as f:
+        f.write(b"".join(partes))
+    os.replace(temporario, destino)
+    return destino
+
+class PaisesCompilados(Mapping):
+    """
+    Países lidos de um ficheiro criado por compilar_paises, através de mmap: abrir
+    o ficheiro não lê os dados (só o cabeçalho) e as páginas ficam partilhadas entre
+    processos. Comporta-se como o resultado de validar_paises (mesma ordem e mesmos
+    campos), mas cada país só é descodificado quando é pedido. Os dados foram
+    validados ao compilar, por isso não são verificados outra vez.
+    """
+
+    def __init__(self, caminho):
+        if sys.byteorder != "little":
+            raise ValueError("formato compilado só suportado em little-endian")
+
+        with open(caminho, 'rb') as f:
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mapa) < CABECALHO_PAISES.size:
+            raise ValueError(f"'{caminho}' não é um ficheiro de países compilado")
+
+        (magia, self.n, n_textos, n_animais, self.tamanho_origem,
+         self.mtime_origem, sha256) = CABECALHO_PAISES.unpack_from(self.mapa)
+        if magia != MAGIA_PAISES:
+            raise ValueError(f"'{caminho}' não é um ficheiro de países compilado")
+        self.hash_dados = sha256.hex()
+
+        # Vistas sobre o ficheiro mapeado (nada é copiado)
+        vista = memoryview(self.mapa)
+        posicao = CABECALHO_PAISES.size
+
+        def secao(quantidade, formato, tamanho):
+            nonlocal posicao
+            fim = posicao + quantidade * tamanho
+            # Um ficheiro cortado a meio deixaria a secção com um tamanho que cast() recusa
+            if fim > len(self.mapa):
+                raise ValueError(f"'{caminho}' está incompleto")
+            parte = vista[posicao:fim].cast(formato)
+            posicao = fim
+            return parte
+
+        self.offsets = secao(n_textos + 1, "I", 4)
+        self.coordenadas = secao(2 * self.n, "d", 8)
+        self.colunas = {coluna: secao(self.n, "I", 4) for coluna in COLUNAS_TEXTO}
+        self.inicio_animais = secao(self.n + 1, "I", 4)
+        self.animais = secao(n_animais, "I", 4)
+        self.ordem = secao(self.n, "I", 4)
+        self.textos = vista[posicao:]
+        if len(self.textos) != self.offsets[-1]:
+            raise ValueError(f"'{caminho}' está incompleto")
+
+        self.descodificados = {}
+
+    def texto(self, id_texto):
+        if id_texto == SEM_TEXTO:
+            return None
+        return bytes(self.textos[self.offsets[id_texto]:self.offsets[id_texto + 1]]).decode('utf-8')
+
+    def nome(self, i):
+        return self.texto(self.colunas["nome"][i])
+
+    def indice(self, nome):
+        """Posição do país no ficheiro (procura binária pelo nome) ou None."""
+        chave = nome.encode('utf-8')
+        colunas_nome, inicio, fim = self.colunas["nome"], 0, self.n
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            i = self.ordem[meio]
+            id_nome = colunas_nome[i]
+            atual = bytes(self.textos[self.offsets[id_nome]:self.offsets[id_nome + 1]])
+            if atual < chave:
+                inicio = meio + 1
+            elif atual > chave:
+                fim = meio
+            else:
+                return i
+        return None
+
+    def lista_coordenadas(self):
+        """(latitude, longitude) de todos os países, lidos da coluna (sem descodificar registos)."""
+        pares = self.coordenadas
+        return [(pares[2 * i], pares[2 * i + 1]) for i in range(self.n)]
+
+    def valores(self, coluna):
+        """Texto de uma coluna (ex.: "clima") para todos os países; cada texto distinto é lido uma vez."""
+        ids = self.colunas[coluna]
+        textos = {}
+        return [textos[j] if j in textos else textos.setdefault(j, self.texto(j)) for j in ids]
+
+    def registo(self, i):
+        """Dicionário do país na posição i, igual ao de validar_paises."""
+        info = self.descodificados.get(i)
+        if info is None:
+            info = {"coordenadas": [self.coordenadas[2 * i], self.coordenadas[2 * i + 1]]}
+            for coluna in COLUNAS_TEXTO[1:]:
+                info[coluna] = self.texto(self.colunas[coluna][i])
+            info["animais"] = [
+                self.texto(self.animais[j])
+                for j in range(self.inicio_animais[i], self.inicio_animais[i + 1])
+            ]
+            info["pistas"] = criar_pistas(info)
+            self.descodificados[i] = info
+        return info
+
+    def __getitem__(self, nome):
+        i = self.indice(nome) if isinstance(nome, str) else None
+        if i is None:
+            raise KeyError(nome)
+        return self.registo(i)
+
+    def __contains__(self, nome):
+        return isinstance(nome, str) and self.indice(nome) is not None
+
+    def __iter__(self):
+        return (self.nome(i) for i in range(self.n))
+
+    def __len__(self):
+        return self.n
+
+    def atualizado(self, origem):
+        """True se o ficheiro compilado corresponde ao JSON atual (ou se o JSON não existe)."""
+        try:
+            estado = os.stat(origem)
+        except FileNotFoundError:
+            return True
+        return (estado.st_size, estado.st_mtime_ns) == (self.tamanho_origem, self.mtime_origem)
+
+def carregar_paises(caminho='paises.json'):
+    """
+    Lê os países, já validados (ver validar_paises). Devolve (países, hash SHA-256 do JSON).
+    Usa o ficheiro compilado (paises.bin) se existir e estiver atualizado;
+    senão lê e valida o JSON.
+    """
+    compilado = caminho_compilado(caminho)
+    if os.path.exists(compilado):
+        try:
+            paises = PaisesCompilados(compilado)
+        except (OSError, ValueError) as e:
+            log_dados.warning("Não foi possível usar '%s' (%s); a ler o JSON", compilado, e)
+        else:
+            if paises.atualizado(caminho):
+                return paises, paises.hash_dados
+            log_dados.warning("'%s' está desatualizado; a ler o JSON (recompilar com --compilar-paises)", compilado)
+
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    paises = validar_paises(json.loads(conteudo.decode('utf-8')))
+    return paises, hashlib.sha256(conteudo).hexdigest()
+
+def construir_indice_nomes(paises):
+    """
+    Cria o índice nome normalizado -> nome do país no JSON (incluindo os aliases).
+    É feito uma vez por cada carregamento dos dados, para que cada procura seja
+    só um acesso ao dicionário.
+    """
+    indice_nomes = {}
+    for pais in paises:
+        indice_nomes[normalizar_texto(pais)] = pais
+
+    for alias, nome in ALIASES_PAISES.items():
+        pais = indice_nomes.get(normalizar_texto(nome))
+        chave = normalizar_texto(alias)
+        # Um alias nunca substitui o nome verdadeiro de outro país
+        if pais and chave not in indice_nomes:
+            indice_nomes[chave] = pais
+
+    return indice_nomes
+
+class Nivel:
+    """
+    Países de um nível e a forma como aparece no menu.
+    `paises` mantém a ordem (para que a mesma semente escolha sempre os mesmos
+    países); `conjunto` serve para testar se um país pertence ao nível em O(1).
+    """
+
+    def __init__(self, nome, paises, descricao="países", icone="🌍",
+                 cor="#BDC3C7", cor_texto="black", principal=False):
+        self.nome = nome
+        self.paises = tuple(paises)
+        self.conjunto = frozenset(self.paises)
+        self.descricao = descricao
+        self.icone = icone
+        self.cor = cor
+        self.cor_texto = cor_texto
+        self.principal = principal
+
+    def __len__(self):
+        return len(self.paises)
+
+    def __iter__(self):
+        return iter(self.paises)
+
+    def __getitem__(self, i):
+        return self.paises[i]
+
+    def __contains__(self, pais):
+        return pais in self.conjunto
+
+    def __repr__(self):
+        return f"Nivel({self.nome!r}, {len(self.paises)} países)"
+
+def carregar_definicoes_niveis(caminho=FICHEIRO_NIVEIS):
+    """Lê a lista de definições de níveis; sem ficheiro usa NIVEIS_PADRAO."""
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            definicoes = json.load(f)
+    except FileNotFoundError:
+        log_dados.warning("'%s' não encontrado; a usar um só nível com todos os países", caminho)
+        return NIVEIS_PADRAO
+    if not isinstance(definicoes, list):
+        raise ValueError(f"'{caminho}' deve conter uma lista de níveis")
+    return definicoes
+
+def validar_definicao_nivel(definicao):
+    """Verifica os tipos de uma definição de nível; lança ValueError se não puder ser usada."""
+    if not isinstance(definicao, dict):
+        raise ValueError("não é um objeto")
+    nome = definicao.get("nome")
+    if not isinstance(nome, str) or not nome.strip():
+        raise ValueError("'nome' em falta ou vazio")
+    for campo in ("paises", "continentes", "climas", "excluir_niveis", "excluir_paises"):
+        valor = definicao.get(campo, [])
+        if not isinstance(valor, list) or not all(isinstance(item, str) for item in valor):
+            raise ValueError(f"'{campo}' deve ser uma lista de textos")
+    for campo in ("descricao", "icone", "cor", "cor_texto"):
+        if not isinstance(definicao.get(campo, ""), str):
+            raise ValueError(f"'{campo}' deve ser um texto")
+
+def agrupar_por_campo(paises, campo):
+    """Valor normalizado do campo -> países com esse valor (ex.: cada clima distinto)."""
+    grupos = defaultdict(set)
+    for nome, valor in zip(paises, valores_campo(paises, campo)):
+        grupos[normalizar_texto(valor)].add(nome)
+    return grupos
+
+def paises_com_termos(grupos, termos):
+    """
+    Países cujo valor contém algum dos termos (ex.: "europa" apanha também
+    "Europa e Asia"). Só percorre os valores distintos, não os países.
+    """
+    termos = [normalizar_texto(termo) for termo in termos]
+    encontrados = set()
+    for valor, nomes in grupos.items():
+        if any(termo in valor for termo in termos):
+            encontrados |= nomes
+    return encontrados
+
+def construir_niveis(paises, indice_nomes, definicoes=None):
+    """
+    Resolve as definições de níveis (por omissão as de niveis.json) em objetos Nivel.
+    Cada definição junta países por nome, por continente, por clima ou todos,
+    e pode tirar os de níveis anteriores ("excluir_niveis") ou países soltos.
+    Os nomes passam pelo índice de nomes (inclui aliases) e tudo é feito com
+    conjuntos, por isso o custo cresce com o tamanho dos níveis e não com o produto.
+    """
+    if definicoes is None:
+        definicoes = carregar_definicoes_niveis()
+
+    def resolver(nomes, nivel):
+        encontrados = []
+        for nome_desejado in nomes:
+            # Tentar correspondência exata primeiro, depois normalizada (inclui aliases)
+            pais_real = nome_desejado if nome_desejado in paises else indice_nomes.get(normalizar_texto(nome_desejado))
+            if pais_real:
+                encontrados.append(pais_real)
+            else:
+                log_dados.warning("País do nível %s não encontrado: %s", nivel, nome_desejado)
+        return encontrados
+
+    # Nomes lidos uma vez (nos dados compilados cada iteração descodifica os nomes)
+    todos = list(paises)
+    continentes = climas = None
+    niveis = {}
+    for definicao in definicoes:
+        # Tal como em validar_paises: uma definição inválida é ignorada, as outras ficam
+        try:
+            validar_definicao_nivel(definicao)
+        except ValueError as e:
+            log_dados.warning("Nível %r rejeitado: %s", definicao, e)
+            continue
+        nome = definicao["nome"].strip()
+        if nome in niveis:
+            log_dados.warning("Nível '%s' repetido: fica só o primeiro", nome)
+            continue
+        desconhecidos = set(definicao) - CAMPOS_NIVEL
+        if desconhecidos:
+            log_dados.warning("Nível %s: campos desconhecidos %s", nome, sorted(desconhecidos))
+
+        # Os países listados mantêm a ordem do ficheiro; os restantes seguem a dos dados
+        explicitos = list(dict.fromkeys(resolver(definicao.get("paises", ()), nome)))
+        membros = set(explicitos)
+        if definicao.get("todos"):
+            membros.update(todos)
+        if definicao.get("continentes"):
+            if continentes is None:
+                continentes = agrupar_por_campo(paises, "continente")
+            membros |= paises_com_termos(continentes, definicao["continentes"])
+        if definicao.get("climas"):
+            if climas is None:
+                climas = agrupar_por_campo(paises, "clima")
+            membros |= paises_com_termos(climas, definicao["climas"])
+
+        for outro in definicao.get("excluir_niveis", ()):
+            if outro in niveis:
+                membros -= niveis[outro].conjunto
+            else:
+                log_dados.warning("Nível %s: nível a excluir não definido antes: %s", nome, outro)
+        membros -= set(resolver(definicao.get("excluir_paises", ()), nome))
+
+        if not membros:
+            log_dados.warning("Nível %s ficou sem países; ignorado", nome)
+            continue
+
+        ja_listados = set(explicitos)
+        ordem = [p for p in explicitos if p in membros]
+        ordem += [p for p in todos if p in membros and p not in ja_listados]
+        niveis[nome] = Nivel(
+            nome, ordem,
+            descricao=definicao.get("descricao", "países"),
+            icone=definicao.get("icone", "🌍"),
+            cor=definicao.get("cor", "#BDC3C7"),
+            cor_texto=definicao.get("cor_texto", "black"),
+            principal=bool(definicao.get("principal")),
+        )
+
+    if not niveis:
+        niveis["Todos"] = Nivel("Todos", todos, principal=True)
+    return niveis
+
+class BaralhoPaises:
+    """
+    Países ainda por mostrar num jogo. Cada tirada troca um país ao acaso com o
+    último por mostrar e encolhe o baralho (Fisher-Yates feito aos poucos), por isso
+    escolher o país seguinte é O(1) e a lista dos disponíveis nunca é refeita.
+    """
+
+    def __init__(self, paises, aleatorio):
+        self.paises = list(paises)
+        self.restantes = len(self.paises)
+        self.aleatorio = aleatorio
+        self.topo_escolhido = False  # espreitar() já fixou o próximo a sair
+
+    def __len__(self):
+        return self.restantes
+
+    def espreitar(self):
+        """País que sai na próxima tirada (escolhido agora, se ainda não foi), ou None."""
+        if not self.restantes:
+            return None
+        ultimo = self.restantes - 1
+        if not self.topo_escolhido:
+            i = self.aleatorio.randrange(self.restantes)
+            self.paises[i], self.paises[ultimo] = self.paises[ultimo], self.paises[i]
+            self.topo_escolhido = True
+        return self.paises[ultimo]
+
+    def tirar(self):
+        """Tira o próximo país do baralho, ou None se já saíram todos."""
+        pais = self.espreitar()
+        if pais is not None:
+            self.restantes -= 1
+            self.topo_escolhido = False
+        return pais
+
+    def mostrados(self):
+        """Países já tirados, pela ordem em que saíram."""
+        return self.paises[self.restantes:][::-1]
+
+def peso_adaptativo(estado):
+    """
+    Peso de um país na seleção adaptativa a partir do estado [força, distância média]
+    (None = nunca jogado). Cada ponto de força divide o peso por 2.
+    """
+    if estado is None:
+        return 1.0
+    forca, distancia = estado
+    return 2.0 ** -forca * (1 + distancia / DISTANCIA_REFERENCIA_KM)
+
+class ArvoreFenwick:
+    """
+    Somas prefixas de uma lista de pesos (árvore de Fenwick): mudar um peso e
+    encontrar a posição de uma soma acumulada custam O(log n).
+    """
+
+    def __init__(self, pesos):
+        self.n = len(pesos)
+        self.arvore = [0.0] + [float(peso) for peso in pesos]
+        # Construção em O(n): cada nó passa a sua soma ao pai
+        for i in range(1, self.n + 1):
+            pai = i + (i & -i)
+            if pai <= self.n:
+                self.arvore[pai] += self.arvore[i]
+
+    def somar(self, i, delta):
+        """Soma delta ao peso da posição i."""
+        i += 1
+        while i <= self.n:
+            self.arvore[i] += delta
+            i += i & -i
+
+    def total(self):
+        """Soma de todos os pesos."""
+        soma = 0.0
+        i = self.n
+        while i > 0:
+            soma += self.arvore[i]
+            i -= i & -i
+        return soma
+
+    def procurar(self, valor):
+        """Primeira posição em que a soma acumulada passa `valor` (n se nenhuma)."""
+        posicao = 0
+        passo = 1 << self.n.bit_length()
+        while passo:
+            seguinte = posicao + passo
+            if seguinte <= self.n and self.arvore[seguinte] <= valor:
+                posicao = seguinte
+                valor -= self.arvore[seguinte]
+            passo >>= 1
+        return posicao
+
+class SorteioAdaptativo:
+    """
+    Como BaralhoPaises, mas cada país sai com probabilidade proporcional ao seu
+    peso (ver peso_adaptativo). Os pesos ficam numa ArvoreFenwick: tirar um país
+    (peso a zero) e atualizar o peso depois de um palpite custam O(log n).
+    """
+
+    def __init__(self, paises, pesos, aleatorio):
+        self.paises = list(paises)
+        self.indices = {pais: i for i, pais in enumerate(self.paises)}
+        self.pesos = list(pesos)
+        self.arvore = ArvoreFenwick(self.pesos)
+        self.aleatorio = aleatorio
+        self.tirado = [False] * len(self.paises)
+        self.tirados = []
+        self.topo = None  # Índice do próximo a sair, já escolhido por espreitar()
+
+    def __len__(self):
+        return len(self.paises) - len(self.tirados)
+
+    def espreitar(self):
+        """País que sai na próxima tirada (escolhido agora, se ainda não foi), ou None."""
+        if not len(self):
+            return None
+        if self.topo is None:
+            i = self.arvore.procurar(self.aleatorio.random() * self.arvore.total())
+            if i >= len(self.paises) or self.tirado[i]:
+                # Só por arredondamentos das somas: fica o primeiro que ainda não saiu
+                i = self.tirado.index(False)
+            self.topo = i
+        return self.paises[self.topo]
+
+    def tirar(self):
+        """Tira o próximo país, ou None se já saíram todos."""
+        pais = self.espreitar()
+        if pais is not None:
+            self.arvore.somar(self.topo, -self.pesos[self.topo])
+            self.tirado[self.topo] = True
+            self.tirados.append(pais)
+            self.topo = None
+        return pais
+
+    def mostrados(self):
+        """Países já tirados, pela ordem em que saíram."""
+        return list(self.tirados)
+
+    def atualizar(self, pais, peso):
+        """Muda o peso de um país (se já saiu, só conta para quando voltar a entrar)."""
+        i = self.indices.get(pais)
+        if i is None:
+            return
+        if not self.tirado[i]:
+            self.arvore.somar(i, peso - self.pesos[i])
+        self.pesos[i] = peso
+
+class MotorJogo:
+    """
+    Regras e estado de um jogo: escolha dos países, pontuação, pistas e vidas.
+    Não depende de tkinter nem de PIL, por isso pode ser usado pela interface,
+    em testes ou para simular muitos jogos seguidos. Os países devem vir de
+    carregar_paises (ou validar_paises).
+    ao_evento(tipo, **dados), se existir, é chamado em cada ronda, palpite e pista.
+    definicoes_niveis substitui as de niveis.json (ver construir_niveis).
+    """
+
+    VIDAS_INICIAIS = 3
+    ERROS_PARA_MAPA = 10  # Ao fim de tantos erros seguidos abre-se a localização exata
+    PONTOS_ACERTO = 1000
+
+    def __init__(self, paises, hash_dados=None, aleatorio=None, ao_evento=None, definicoes_niveis=None):
+        self.paises = paises
+        self.aleatorio = aleatorio if aleatorio is not None else random.Random()
+        self.ao_evento = ao_evento
+
+        # Índices construídos uma vez por conjunto de dados
+        self.indice_nomes = construir_indice_nomes(paises)
+        self.indice_aproximado = IndiceAproximado(self.indice_nomes)
+        self.indice_prefixos = IndicePrefixos(self.indice_nomes)
+        self.matriz_distancias = MatrizDistancias(paises, hash_dados)
+        self.indice_espacial = IndiceEspacial(
+            dict(zip(self.matriz_distancias.nomes, self.matriz_distancias.coordenadas))
+        )
+        self.niveis = construir_niveis(paises, self.indice_nomes, definicoes_niveis)
+
+        self.utilizador = None
+        self.iniciar_jogo(None)
+
+    def iniciar_jogo(self, nivel, utilizador=None, semente=None, historico=None):
+        """
+        Começa um jogo novo no nível indicado, com uma semente (escolhida ao acaso
+        se não for dada). Sem historico a escolha é uniforme e a ordem dos países
+        depende só da semente, por isso o jogo pode ser repetido tal e qual.
+        Com historico (país -> [força, distância média], do jogador) a escolha é
+        adaptativa e o histórico é atualizado em cada palpite; a ordem passa a
+        depender também do histórico no início do jogo.
+        """
+        self.nivel = nivel
+        if utilizador is not None:
+            self.utilizador = utilizador
+        self.semente = semente if semente is not None else self.aleatorio.getrandbits(32)
+        self.historico = historico
+        paises_nivel = self.niveis[nivel] if nivel is not None else ()
+        if historico is not None:
+            self.baralho = SorteioAdaptativo(
+                paises_nivel, [peso_adaptativo(historico.get(p)) for p in paises_nivel],
+                random.Random(self.semente)
+            )
+        else:
+            self.baralho = BaralhoPaises(paises_nivel, random.Random(self.semente))
+        self.pontos = 0
+        self.vidas = self.VIDAS_INICIAIS
+        self.pais_atual = None
+        self.pistas_dadas = 0
+        self.tentativas_erradas = 0
+        self.erros_ronda = 0
+        self.inicio_ronda = None
+        if nivel is not None:
+            # Só os jogos não adaptativos podem ser repetidos apenas com a semente
+            self.registar("jogo", nivel=nivel, semente=self.semente, adaptativo=historico is not None)
+
+    def registar(self, tipo, **dados):
+        """Envia um evento para ao_evento (se existir)."""
+        if self.ao_evento is not None:
+            self.ao_evento(tipo, utilizador=self.utilizador, **dados)
+
+    @property
+    def paises_ja_mostrados(self):
+        """Países do nível já mostrados neste jogo (incluindo o atual)."""
+        return self.baralho.mostrados()
+
+    def nova_ronda(self):
+        """Escolhe o país da ronda. Devolve None quando o nível está completo."""
+        # Se escolher_proximo_pais já foi chamado, sai o país que ele escolheu
+        self.pais_atual = self.baralho.tirar()
+        if self.pais_atual is None:
+            return None
+
+        self.pistas_dadas = 0
+        self.tentativas_erradas = 0
+        self.erros_ronda = 0
+        self.inicio_ronda = time.monotonic()
+        self.registar("ronda", nivel=self.nivel, pais=self.pais_atual)
+        return self.pais_atual
+
+    def escolher_proximo_pais(self):
+        """Escolhe já o país da ronda seguinte (ex.: para preparar a imagem). Pode ser None."""
+        return self.baralho.espreitar()
+
+    def pista(self, numero):
+        """Texto da pista (1: continente, 2: clima, 3: animal) do país atual, ou None."""
+        pistas = self.paises[self.pais_atual]["pistas"]
+        return pistas[numero - 1] if numero <= len(pistas) else None
+
+    def proxima_pista(self):
+        """Dá a pista seguinte depois de um erro. Devolve (número, texto) ou None."""
+        numero = self.pistas_dadas + 2  # A pista 1 é mostrada logo no início da ronda
+        texto = self.pista(numero)
+        if texto is None:
+            return None
+
+        self.pistas_dadas += 1
+        self.registar("pista", pais=self.pais_atual, numero=numero)
+        return numero, texto
+
+    def encontrar_pais(self, palpite):
+        """Encontra o país considerando variações do nome e aliases (None se não existir)."""
+        return self.indice_nomes.get(normalizar_texto(palpite))
+
+    def sugerir_pais(self, palpite):
+        """Sugere o país com o nome mais parecido (para palpites com erros de escrita)."""
+        return self.indice_aproximado.procurar(normalizar_texto(palpite))
+
+    def coordenadas_pais(self, pais):
+        """(latitude, longitude) de um país, já lidas pela matriz de distâncias."""
+        return self.matriz_distancias.coordenadas[self.matriz_distancias.indice(pais)]
+
+    def paises_mais_proximos(self, pais, k=5):
+        """Os k países mais próximos de um país, como lista de (nome, distância em km)."""
+        lat, lon = self.coordenadas_pais(pais)
+        return self.indice_espacial.mais_proximos(lat, lon, k, excluir=(pais,))
+
+    def paises_no_raio(self, pais, raio_km):
+        """Países a menos de raio_km de um país, do mais perto para o mais longe."""
+        lat, lon = self.coordenadas_pais(pais)
+        return self.indice_espacial.no_raio(lat, lon, raio_km, excluir=(pais,))
+
+    def verificar(self, palpite):
+        """
+        Aplica um palpite à ronda atual e devolve um dicionário com o resultado:
+        - {"resultado": "correto", "pais", "pontos"}
+        - {"resultado": "errado", "pais", "distancia", "pontos", "abrir_mapa", "pista"}
+        - {"resultado": "desconhecido", "sugestao"}
+        """
+        pais_encontrado = self.encontrar_pais(palpite)
+
+        if pais_encontrado is None:
+            return {"resultado": "desconhecido", "sugestao": self.sugerir_pais(palpite)}
+
+        if pais_encontrado == self.pais_atual:
+            self.registar(
+                "palpite", pais=self.pais_atual, palpite=pais_encontrado,
+                correto=True, tempo=round(time.monotonic() - self.inicio_ronda, 2)
+            )
+            self.pontos += self.PONTOS_ACERTO
+            self.tentativas_erradas = 0
+            self.atualizar_historico(correto=True)
+            return {"resultado": "correto", "pais": pais_encontrado, "pontos": self.PONTOS_ACERTO}
+
+        # País válido, mas errado
+        distancia, pontos = self.matriz_distancias.pontos_entre(pais_encontrado, self.pais_atual)
+        self.registar(
+            "palpite", pais=self.pais_atual, palpite=pais_encontrado,
+            correto=False, distancia=round(distancia, 1)
+        )
+        self.pontos += pontos
+        self.erros_ronda += 1
+        self.atualizar_historico(distancia=distancia)
+
+        # Ao fim de ERROS_PARA_MAPA erros, a interface abre a localização exata
+        self.tentativas_erradas += 1
+        abrir_mapa = self.tentativas_erradas >= self.ERROS_PARA_MAPA
+        if abrir_mapa:
+            self.tentativas_erradas = 0
+
+        return {
+            "resultado": "errado",
+            "pais": pais_encontrado,
+            "distancia": distancia,
+            "pontos": pontos,
+            "abrir_mapa": abrir_mapa,
+            "pista": self.proxima_pista()
+        }
+
+    def atualizar_historico(self, correto=False, distancia=None):
+        """
+        Atualiza o estado [força, distância média] do país atual no histórico do
+        jogador e o seu peso no sorteio. Acertar sem erros sobe a força; acertar
+        depois de errar desce-a. Devolve o estado (None se o jogo não é adaptativo).
+        """
+        if self.historico is None:
+            return None
+        estado = self.historico.setdefault(self.pais_atual, [0, 0.0])
+        # Arredondada (e convertida de float32 da matriz) para ser guardada
+        if distancia is not None:
+            estado[1] = round(estado[1] + SUAVIZACAO_DISTANCIA * (float(distancia) - estado[1]), 1)
+        if correto:
+            if self.erros_ronda == 0:
+                estado[0] = min(FORCA_MAXIMA, estado[0] + 1)
+                estado[1] = round(estado[1] * (1 - SUAVIZACAO_DISTANCIA), 1)
+            else:
+                estado[0] = max(0, estado[0] - 1)
+        self.baralho.atualizar(self.pais_atual, peso_adaptativo(estado))
+        return estado
+
+    @property
+    def sem_vidas(self):
+        return self.vidas <= 0
+
+    def usar_localizacao(self):
+        """Gasta uma vida para ver a localização exata. Devolve (lat, lon) ou None sem vidas."""
+        if self.sem_vidas or self.pais_atual is None:
+            return None
+        self.vidas -= 1
+        return tuple(self.paises[self.pais_atual]["coordenadas"])
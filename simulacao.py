@@ -0,0 +1,235 @@
+"""
+Simulação Monte Carlo do Explorador Virtual: joga muitos jogos sintéticos com o
+MotorJogo para ver a distribuição das pontuações de cada nível e medir o
+desempenho (rondas por segundo).
+
+Uso: python simulacao.py [--jogos N] [--processos N] [--nivel NOME]
+                         [--jogador NOME] [--acerto P] [--semente N]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from motor_jogo import MotorJogo, carregar_paises, construir_indice_nomes, construir_niveis
+
+TAMANHO_LOTE = 200  # Jogos por tarefa enviada a cada processo
+TOLERANCIA_KM = 1.0  # Margem ao comparar distâncias (a matriz pode estar em float32)
+LARGURA_HISTOGRAMA = 40
+
+class JogadorAleatorio:
+    """
+    Escolhe ao acaso entre os países que ainda não tentou nesta ronda.
+    Com probabilidade `acerto` já sabe a resposta logo no primeiro palpite
+    (serve para imitar o quanto um nível é conhecido).
+    """
+
+    def __init__(self, motor, aleatorio, acerto=0.0):
+        self.motor = motor
+        self.aleatorio = aleatorio
+        self.acerto = acerto
+        self.todos = list(motor.paises)
+
+    def comecar_ronda(self):
+        self.candidatos = set(self.todos)
+        self.resposta = None
+        if self.acerto and self.aleatorio.random() < self.acerto:
+            self.resposta = self.motor.pais_atual
+
+    def palpite(self):
+        if self.resposta is not None:
+            return self.resposta
+        # sorted() para que a mesma semente dê sempre os mesmos jogos
+        return self.aleatorio.choice(sorted(self.candidatos))
+
+    def aprender(self, palpite, resultado):
+        """Recebe o resultado de um palpite errado (distância e pista nova)."""
+        self.candidatos.discard(palpite)
+
+    def revelar(self, pais):
+        """A localização exata foi aberta: o próximo palpite é o certo."""
+        self.resposta = pais
+
+class JogadorPistas(JogadorAleatorio):
+    """Como o aleatório, mas só escolhe países compatíveis com as pistas já dadas."""
+
+    def __init__(self, motor, aleatorio, acerto=0.0):
+        super().__init__(motor, aleatorio, acerto)
+        # (número da pista, texto) -> países com essa pista, calculado uma vez
+        self.grupos = {}
+        for nome, info in motor.paises.items():
+            for numero, texto in enumerate(info["pistas"], 1):
+                self.grupos.setdefault((numero, texto), set()).add(nome)
+
+    def filtrar_pista(self, numero, texto):
+        self.candidatos &= self.grupos.get((numero, texto), set())
+
+    def comecar_ronda(self):
+        super().comecar_ronda()
+        # A pista 1 é mostrada logo no início da ronda
+        self.filtrar_pista(1, self.motor.pista(1))
+
+    def aprender(self, palpite, resultado):
+        super().aprender(palpite, resultado)
+        if resultado["pista"] is not None:
+            self.filtrar_pista(*resultado["pista"])
+
+class JogadorTriangulacao(JogadorPistas):
+    """
+    Usa também a distância de cada erro: só ficam os países que estão exatamente
+    a essa distância do palpite errado. É o limite superior de um jogador perfeito.
+    """
+
+    def aprender(self, palpite, resultado):
+        super().aprender(palpite, resultado)
+        matriz = self.motor.matriz_distancias
+        distancia = resultado["distancia"]
+        self.candidatos = {
+            pais for pais in self.candidatos
+            if abs(matriz.distancia_entre(pais, palpite) - distancia) <= TOLERANCIA_KM
+        }
+
+JOGADORES = {
+    "aleatorio": JogadorAleatorio,
+    "pistas": JogadorPistas,
+    "triangulacao": JogadorTriangulacao,
+}
+
+def simular_jogo(motor, jogador, nivel):
+    """
+    Joga um jogo completo seguindo as regras da interface.
+    Devolve (pontos, rondas, palpites, completo).
+    """
+    motor.iniciar_jogo(nivel)
+    rondas = palpites = 0
+
+    while motor.nova_ronda() is not None:
+        rondas += 1
+        jogador.comecar_ronda()
+        while True:
+            palpite = jogador.palpite()
+            palpites += 1
+            resultado = motor.verificar(palpite)
+            if resultado["resultado"] == "correto":
+                break
+
+            jogador.aprender(palpite, resultado)
+            if resultado["abrir_mapa"]:
+                # Tal como na interface: ver a localização exata gasta uma vida
+                if motor.usar_localizacao() is None or motor.sem_vidas:
+                    return motor.pontos, rondas, palpites, False
+                jogador.revelar(motor.pais_atual)
+
+    return motor.pontos, rondas, palpites, True
+
+# Motor de cada processo (criado uma vez em iniciar_processo)
+_motor = None
+
+def iniciar_processo(caminho):
+    """Carrega os países e cria o motor uma única vez por processo."""
+    global _motor
+    paises, hash_dados = carregar_paises(caminho)
+    _motor = MotorJogo(paises, hash_dados)
+
+def simular_lote(nivel, nome_jogador, jogos, semente, acerto):
+    """Simula um lote de jogos. Devolve (lista de resultados, segundos gastos)."""
+    aleatorio = random.Random(semente)
+    _motor.aleatorio = aleatorio
+    jogador = JOGADORES[nome_jogador](_motor, aleatorio, acerto)
+
+    inicio = time.perf_counter()
+    resultados = [simular_jogo(_motor, jogador, nivel) for _ in range(jogos)]
+    return resultados, time.perf_counter() - inicio
+
+def dividir_lotes(jogos, semente):
+    """Divide os jogos em lotes com sementes fixas (o resultado não depende dos processos)."""
+    lotes = []
+    for i, inicio in enumerate(range(0, jogos, TAMANHO_LOTE)):
+        lotes.append((min(TAMANHO_LOTE, jogos - inicio), semente * 1_000_003 + i))
+    return lotes
+
+def simular(nivel, nome_jogador, jogos, processos=None, semente=0, acerto=0.0, caminho='paises.json'):
+    """
+    Simula `jogos` jogos de um nível, em `processos` processos (1 = no próprio processo).
+    Devolve (resultados, segundos de relógio).
+    """
+    lotes = dividir_lotes(jogos, semente)
+    processos = processos or os.cpu_count() or 1
+
+    inicio = time.perf_counter()
+    resultados = []
+    if processos == 1:
+        if _motor is None:
+            iniciar_processo(caminho)
+        for tamanho, semente_lote in lotes:
+            resultados.extend(simular_lote(nivel, nome_jogador, tamanho, semente_lote, acerto)[0])
+    else:
+        with ProcessPoolExecutor(processos, initializer=iniciar_processo, initargs=(caminho,)) as executor:
+            tarefas = [
+                executor.submit(simular_lote, nivel, nome_jogador, tamanho, semente_lote, acerto)
+                for tamanho, semente_lote in lotes
+            ]
+            for tarefa in tarefas:
+                resultados.extend(tarefa.result()[0])
+    return resultados, time.perf_counter() - inicio
+
+def mostrar_histograma(pontuacoes, barras=10):
+    """Histograma simples das pontuações, em texto."""
+    minimo, maximo = min(pontuacoes), max(pontuacoes)
+    largura = max(1, (maximo - minimo) / barras)
+    contagens = [0] * barras
+    for pontos in pontuacoes:
+        contagens[min(barras - 1, int((pontos - minimo) / largura))] += 1
+
+    maior = max(contagens)
+    for i, contagem in enumerate(contagens):
+        limite = minimo + i * largura
+        barra = "#" * round(contagem / maior * LARGURA_HISTOGRAMA)
+        print(f"    {limite:>9.0f} | {barra} {contagem}")
+
+def mostrar_relatorio(nivel, nome_jogador, resultados, segundos):
+    """Mostra a distribuição das pontuações e o débito de uma simulação."""
+    pontuacoes = [pontos for pontos, _, _, _ in resultados]
+    rondas = sum(r for _, r, _, _ in resultados)
+    palpites = sum(p for _, _, p, _ in resultados)
+    completos = sum(1 for *_, completo in resultados if completo)
+    decis = statistics.quantiles(pontuacoes, n=10) if len(pontuacoes) > 1 else pontuacoes * 9
+
+    print(f"\n=== {nivel} / {nome_jogador} ({len(resultados)} jogos) ===")
+    print(f"  Pontos: média {statistics.fmean(pontuacoes):.0f} ± {statistics.pstdev(pontuacoes):.0f}"
+          f"  (mín {min(pontuacoes)}, p10 {decis[0]:.0f}, p50 {decis[4]:.0f}, p90 {decis[8]:.0f}, máx {max(pontuacoes)})")
+    print(f"  Nível completo: {completos / len(resultados):.1%}"
+          f"  |  rondas/jogo {rondas / len(resultados):.1f}  |  palpites/ronda {palpites / max(1, rondas):.2f}")
+    print(f"  Débito: {rondas / segundos:,.0f} rondas/s  ({palpites / segundos:,.0f} palpites/s, {segundos:.2f} s)")
+    mostrar_histograma(pontuacoes)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo do Explorador Virtual")
+    parser.add_argument("--jogos", type=int, default=1000, help="jogos por nível")
+    parser.add_argument("--processos", type=int, default=None, help="número de processos (1 = sem pool)")
+    parser.add_argument("--nivel", action="append", help="nível a simular (pode repetir; por omissão os principais de niveis.json)")
+    parser.add_argument("--jogador", choices=sorted(JOGADORES), default="pistas")
+    parser.add_argument("--acerto", type=float, default=0.0, help="probabilidade de saber o país à primeira")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--dados", default="paises.json")
+    args = parser.parse_args()
+
+    if args.nivel:
+        niveis = args.nivel
+    else:
+        # Os níveis principais tal como o motor os resolve (definições inválidas ficam de fora)
+        paises, _ = carregar_paises(args.dados)
+        niveis = [
+            nome for nome, nivel in construir_niveis(paises, construir_indice_nomes(paises)).items()
+            if nivel.principal
+        ]
+    for nivel in niveis:
+        resultados, segundos = simular(
+            nivel, args.jogador, args.jogos, args.processos, args.semente, args.acerto, args.dados
+        )
+        mostrar_relatorio(nivel, args.jogador, resultados, segundos)
+
+if __name__ == "__main__":
+    main()
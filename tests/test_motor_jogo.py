@@ -0,0 +1,156 @@
+import json
+import math
+import random
+
+import pytest
+
+from motor_jogo import (
+    ArvoreFenwick, IndiceEspacial, MotorJogo, PaisesCompilados, SorteioAdaptativo, calcular_distancia,
+    carregar_paises, compilar_paises, construir_indice_nomes, construir_niveis, validar_pais
+)
+
+PAISES = {
+    "Portugal": {
+        "coordenadas": [39.5, -8.0], "continente": "Europa", "capital": "Lisboa",
+        "clima": "Mediterranico", "animais": ["Lobo-ibérico"], "imagem": "portugal.jpg"
+    },
+    "Brasil": {
+        "coordenadas": [-14.2, -51.9], "continente": "America do Sul", "capital": "Brasília",
+        "clima": "Tropical", "animais": ["Onça-pintada"], "imagem": "brasil.jpg"
+    },
+}
+
+@pytest.fixture
+def paises_json(tmp_path):
+    caminho = tmp_path / "paises.json"
+    caminho.write_text(json.dumps(PAISES, ensure_ascii=False), encoding="utf-8")
+    return caminho
+
+def test_compilado_igual_ao_json(paises_json):
+    compilado = PaisesCompilados(compilar_paises(str(paises_json)))
+    paises, _ = carregar_paises(str(paises_json))
+    assert list(compilado) == list(paises)
+    assert compilado["Portugal"] == paises["Portugal"]
+
+def test_motor_nao_descodifica_paises_compilados(paises_json):
+    compilado = PaisesCompilados(compilar_paises(str(paises_json)))
+    motor = MotorJogo(compilado, definicoes_niveis=[
+        {"nome": "Europa", "continentes": ["europa"]},
+        {"nome": "Tropical", "climas": ["tropical"]},
+    ])
+    assert list(motor.niveis["Europa"]) == ["Portugal"]
+    assert list(motor.niveis["Tropical"]) == ["Brasil"]
+    assert motor.paises_mais_proximos("Portugal", 1)[0][0] == "Brasil"
+    # Índices e níveis saem das colunas; nenhum registo foi descodificado
+    assert compilado.descodificados == {}
+
+def test_compilado_cortado_usa_o_json(paises_json):
+    destino = compilar_paises(str(paises_json))
+    with open(destino, "rb") as f:
+        conteudo = f.read()
+
+    # Cortes em todas as posições, incluindo as que não caem no fim de um campo
+    for tamanho in range(1, len(conteudo)):
+        with open(destino, "wb") as f:
+            f.write(conteudo[:tamanho])
+        with pytest.raises(ValueError):
+            PaisesCompilados(destino)
+
+        paises, _ = carregar_paises(str(paises_json))
+        assert paises["Brasil"]["capital"] == "Brasília"
+
+@pytest.mark.parametrize("coordenadas", [
+    "12", [True, False], [1.0], [1.0, 2.0, 3.0], ["1", "2"], [float("nan"), 0.0], None, {"lat": 1, "lon": 2},
+])
+def test_coordenadas_invalidas_rejeitadas(coordenadas):
+    info = dict(PAISES["Portugal"], coordenadas=coordenadas)
+    with pytest.raises(ValueError):
+        validar_pais("Portugal", info)
+
+def test_coordenadas_validas_normalizadas():
+    normalizado, _ = validar_pais("Portugal", dict(PAISES["Portugal"], coordenadas=(39, -8)))
+    assert normalizado["coordenadas"] == [39.0, -8.0]
+
+def test_definicoes_de_niveis_invalidas_ignoradas(paises_json):
+    paises, _ = carregar_paises(str(paises_json))
+    niveis = construir_niveis(paises, construir_indice_nomes(paises), [
+        "Fácil",
+        {"paises": ["Portugal"]},
+        {"nome": "Clima", "climas": "tropical"},
+        {"nome": "Europa", "continentes": ["europa"]},
+        {"nome": "Europa", "paises": ["Brasil"]},
+    ])
+    assert list(niveis) == ["Europa"]
+    assert list(niveis["Europa"]) == ["Portugal"]
+
+def test_matriz_distancias_acima_do_limite_calcula_a_pedido(monkeypatch):
+    import motor_jogo
+    monkeypatch.setattr(motor_jogo, "LIMITE_MATRIZ_DISTANCIAS", 1)
+    matriz = motor_jogo.MatrizDistancias(PAISES)
+    assert matriz.matriz is None
+    esperada = motor_jogo.calcular_distancia(PAISES["Portugal"]["coordenadas"], PAISES["Brasil"]["coordenadas"])
+    assert matriz.distancia_entre("Portugal", "Brasil") == esperada
+    assert matriz.pontos_entre("Portugal", "Brasil") == (esperada, motor_jogo.calcular_pontos(esperada))
+
+def test_fenwick_procurar_salta_pesos_nulos():
+    arvore = ArvoreFenwick([0.0, 2.0, 0.0, 0.0, 3.0, 0.0])
+    assert arvore.total() == 5.0
+    assert arvore.procurar(0.0) == 1
+    assert arvore.procurar(1.999) == 1
+    assert arvore.procurar(2.0) == 4
+    assert arvore.procurar(4.999) == 4
+    assert arvore.procurar(5.0) == 6
+
+def test_sorteio_adaptativo_segue_os_pesos():
+    paises = ["A", "B", "C", "D"]
+    pesos = [1.0, 2.0, 0.0, 5.0]
+    aleatorio = random.Random(7)
+    contagens = dict.fromkeys(paises, 0)
+    tiragens = 20000
+    for _ in range(tiragens):
+        contagens[SorteioAdaptativo(paises, pesos, aleatorio).tirar()] += 1
+    assert contagens["C"] == 0
+    for pais, peso in zip(paises, pesos):
+        assert contagens[pais] / tiragens == pytest.approx(peso / sum(pesos), abs=0.01)
+
+def test_sorteio_adaptativo_tira_cada_pais_uma_vez():
+    paises = [f"Pais {i}" for i in range(50)]
+    aleatorio = random.Random(3)
+    sorteio = SorteioAdaptativo(paises, [aleatorio.uniform(0.01, 2.0) for _ in paises], aleatorio)
+    tirados = []
+    while (pais := sorteio.tirar()) is not None:
+        tirados.append(pais)
+        # Como no jogo: o peso muda depois de cada palpite
+        sorteio.atualizar(pais, aleatorio.uniform(0.01, 2.0))
+        sorteio.atualizar(aleatorio.choice(paises), aleatorio.uniform(0.01, 2.0))
+    assert sorted(tirados) == sorted(paises)
+    assert sorteio.mostrados() == tirados
+    assert len(sorteio) == 0
+
+def test_sorteio_adaptativo_atualizar_pais_tirado_nao_muda_total():
+    sorteio = SorteioAdaptativo(["A", "B", "C"], [1.0, 2.0, 3.0], random.Random(1))
+    pais = sorteio.tirar()
+    total = sorteio.arvore.total()
+    sorteio.atualizar(pais, 10.0)
+    assert sorteio.arvore.total() == total
+    assert sorteio.pesos[sorteio.indices[pais]] == 10.0
+
+def test_indice_espacial_igual_a_procura_exaustiva():
+    aleatorio = random.Random(42)
+    pontos = {
+        f"Lugar {i}": (math.degrees(math.asin(aleatorio.uniform(-1, 1))), aleatorio.uniform(-180, 180))
+        for i in range(3000)
+    }
+    indice = IndiceEspacial(pontos)
+
+    for _ in range(50):
+        alvo = (aleatorio.uniform(-90, 90), aleatorio.uniform(-180, 180))
+        todos = sorted((calcular_distancia(alvo, ponto), nome) for nome, ponto in pontos.items())
+
+        proximos = indice.mais_proximos(*alvo, k=10)
+        assert [nome for nome, _ in proximos] == [nome for _, nome in todos[:10]]
+        assert [km for _, km in proximos] == pytest.approx([km for km, _ in todos[:10]], abs=1e-6)
+
+        raio = aleatorio.uniform(100, 2000)
+        no_raio = indice.no_raio(*alvo, raio)
+        assert [nome for nome, _ in no_raio] == [nome for km, nome in todos if km <= raio]